@@ -0,0 +1,520 @@
+"""
+Shared microphone capture
+
+A single always-on capture thread reads 16 kHz mono int16 audio from the
+microphone and writes it into a fixed-size ring buffer. The wake word
+detector, the command recorder and the calibration logic each read from the
+buffer through their own cursor, so the device is opened exactly once.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-size ring buffer of int16 samples addressed by absolute position"""
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0  # Total samples ever written (monotonic)
+        self._cond = threading.Condition()
+
+    @property
+    def written(self) -> int:
+        """Absolute position of the next sample to be written"""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still held"""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest data when full"""
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+
+        with self._cond:
+            start = (self._written + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            if first < n:
+                self._data[:n - first] = samples[first:]
+            self._written += skipped + n
+            self._cond.notify_all()
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until the buffer holds data up to `position`"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= position, timeout)
+
+    def read(self, start: int, count: int) -> np.ndarray:
+        """Copy `count` samples starting at absolute position `start`"""
+        out = np.empty(count, dtype=np.int16)
+        self.read_into(start, out)
+        return out
+
+    def read_into(self, start: int, out: np.ndarray):
+        """Copy samples starting at absolute position `start` into `out`"""
+        count = len(out)
+        with self._cond:
+            if start < self.oldest or start + count > self._written:
+                raise IndexError("Requested range is not held by the ring buffer")
+            begin = start % self.capacity
+            first = min(count, self.capacity - begin)
+            out[:first] = self._data[begin:begin + first]
+            if first < count:
+                out[first:] = self._data[:count - first]
+
+    def reader(self, start: Optional[int] = None) -> "RingReader":
+        """Create a cursor positioned at `start` (default: live position)"""
+        return RingReader(self, self._written if start is None else start)
+
+
+class RingReader:
+    """Independent read cursor over an AudioRingBuffer"""
+
+    def __init__(self, ring: AudioRingBuffer, position: int):
+        self.ring = ring
+        self.position = position
+        self.overruns = 0  # Times this reader fell behind and lost audio
+
+    def available(self) -> int:
+        """Number of samples ready to read without blocking"""
+        return self.ring.written - self.position
+
+    def seek_live(self):
+        """Skip everything buffered and continue from the live position"""
+        self.position = self.ring.written
+
+    def read(self, count: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Read the next `count` samples, or None if they don't arrive in time"""
+        out = np.empty(count, dtype=np.int16)
+        return out if self.read_into(out, timeout) else None
+
+    def read_into(self, out: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """Fill `out` with the next samples; False if they don't arrive in time"""
+        count = len(out)
+        if not self.ring.wait_for(self.position + count, timeout):
+            return False
+        try:
+            self.ring.read_into(self.position, out)
+        except IndexError:
+            # Fell behind the writer: drop the lost audio and keep going
+            self.overruns += 1
+            self.position = self.ring.oldest
+            self.ring.read_into(self.position, out)
+        self.position += count
+        return True
+
+
+class PcmBuffer:
+    """Preallocated mono int16 utterance buffer with a reusable float32 view.
+
+    Captured frames are copied straight into place, and conversion to the
+    float32 [-1, 1] audio Whisper expects writes into a second preallocated
+    array, so a turn allocates no full-length copies.
+    """
+
+    def __init__(self, capacity: int, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.pcm = np.zeros(capacity, dtype=np.int16)
+        self._float = np.zeros(capacity, dtype=np.float32)
+        self.length = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.pcm)
+
+    @property
+    def free(self) -> int:
+        return len(self.pcm) - self.length
+
+    @property
+    def samples(self) -> np.ndarray:
+        """int16 view of the captured audio"""
+        return self.pcm[:self.length]
+
+    @property
+    def duration(self) -> float:
+        return self.length / self.sample_rate
+
+    def clear(self):
+        self.length = 0
+
+    def append(self, samples: np.ndarray):
+        """Copy samples onto the end, truncating at capacity"""
+        n = min(len(samples), self.free)
+        self.pcm[self.length:self.length + n] = samples[:n]
+        self.length += n
+
+    def append_from_ring(self, ring: AudioRingBuffer, start: int, count: int):
+        """Copy a range of the ring buffer onto the end (raises IndexError if it was overwritten)"""
+        count = min(count, self.free)
+        ring.read_into(start, self.pcm[self.length:self.length + count])
+        self.length += count
+
+    def as_float32(self) -> np.ndarray:
+        """float32 view of the audio in [-1, 1], converted in place into the reusable buffer"""
+        out = self._float[:self.length]
+        np.multiply(self.samples, np.float32(1.0 / 32768.0), out=out, dtype=np.float32)
+        return out
+
+    def levels(self):
+        """(peak, rms) of the float32 audio, computed with reductions only (no temporaries)"""
+        if self.length == 0:
+            return 0.0, 0.0
+        # Refresh the float view: samples may have been written since the last as_float32()
+        audio = self.as_float32()
+        peak = max(float(audio.max()), -float(audio.min()))
+        rms = float(np.sqrt(np.dot(audio, audio) / self.length))
+        return peak, rms
+
+    def to_audio_data(self):
+        """Wrap a copy of the audio as speech_recognition.AudioData (for Google STT)"""
+        import speech_recognition as sr
+        return sr.AudioData(self.samples.tobytes(), self.sample_rate, 2)
+
+
+class MicrophoneStream:
+    """Always-on microphone capture feeding an AudioRingBuffer"""
+
+    def __init__(self, device_index=None, sample_rate: int = 16000,
+                 block_size: int = 512, buffer_seconds: float = 30.0):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.buffer = AudioRingBuffer(int(sample_rate * buffer_seconds))
+        self.overflows = 0  # Input overflows reported by PortAudio
+        self._listeners = []  # Called with every captured block on the capture thread
+        self._running = threading.Event()
+        self._thread = None
+        self._error = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def start(self, timeout: float = 5.0):
+        """Open the device and start the capture thread"""
+        if self.is_running:
+            return
+        ready = threading.Event()
+        self._error = None
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._capture_loop, args=(ready,), daemon=True, name="mic-capture"
+        )
+        self._thread.start()
+        ready.wait(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """Stop capturing and close the device"""
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def reader(self, start: Optional[int] = None) -> RingReader:
+        """Create a read cursor (default: live position)"""
+        return self.buffer.reader(start)
+
+    def add_listener(self, callback):
+        """Register a cheap per-block callback (runs on the capture thread)"""
+        self._listeners.append(callback)
+
+    def seconds_to_samples(self, seconds: float) -> int:
+        return int(round(seconds * self.sample_rate))
+
+    def _capture_loop(self, ready: threading.Event):
+        """Read blocks from the device and append them to the ring buffer"""
+        try:
+            import sounddevice as sd
+            stream = sd.InputStream(
+                device=self.device_index,
+                channels=1,
+                samplerate=self.sample_rate,
+                dtype="int16",
+                blocksize=self.block_size,
+            )
+            stream.start()
+        except Exception as e:
+            self._error = e
+            self._running.clear()
+            ready.set()
+            return
+
+        ready.set()
+        try:
+            while self._running.is_set():
+                data, overflowed = stream.read(self.block_size)
+                if overflowed:
+                    self.overflows += 1
+                block = data[:, 0]
+                self.buffer.write(block)
+                for callback in self._listeners:
+                    try:
+                        callback(block)
+                    except Exception:
+                        pass
+        except Exception as e:
+            print(f"\n⚠️  Microphone capture stopped: {e}")
+        finally:
+            self._running.clear()
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
+
+
+class NoiseFloorEstimator:
+    """Continuously tracks the background noise floor of the capture stream.
+
+    Registered as a MicrophoneStream listener, it keeps the RMS of every block
+    from the last `window_seconds` and periodically takes a low percentile of
+    them as the noise floor, so speech bursts don't drag it upwards. Nothing
+    ever has to stop and listen to calibrate.
+    """
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 512,
+                 window_seconds: float = 10.0, percentile: float = 20.0,
+                 ratio: float = 1.5, min_threshold: float = 50.0,
+                 update_interval: float = 0.5):
+        self.percentile = percentile
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self._levels = np.zeros(max(1, int(window_seconds * sample_rate / block_size)), dtype=np.float32)
+        self._count = 0
+        self._index = 0
+        self._update_every = max(1, int(update_interval * sample_rate / block_size))
+        self._since_update = 0
+        self.noise_floor = None  # int16 RMS units, None until the first update
+
+    @property
+    def ready(self) -> bool:
+        return self.noise_floor is not None
+
+    @property
+    def energy_threshold(self) -> Optional[float]:
+        """Energy above which a frame counts as speech (audioop.rms scale)"""
+        if self.noise_floor is None:
+            return None
+        return max(self.min_threshold, self.noise_floor * self.ratio)
+
+    @property
+    def noise_floor_normalized(self) -> Optional[float]:
+        """Noise floor as RMS of float audio in [-1, 1]"""
+        if self.noise_floor is None:
+            return None
+        return self.noise_floor / 32768.0
+
+    def update(self, block: np.ndarray):
+        """Add one captured block (MicrophoneStream listener)"""
+        self._levels[self._index] = rms_int16(block)
+        self._index = (self._index + 1) % len(self._levels)
+        self._count = min(self._count + 1, len(self._levels))
+        self._since_update += 1
+        if self._since_update >= self._update_every:
+            self._since_update = 0
+            self.noise_floor = float(np.percentile(self._levels[:self._count], self.percentile))
+
+
+class PlaybackMute:
+    """Marks capture audio recorded while the assistant itself was speaking.
+
+    There is no echo cancellation, so whatever plays through the speakers is
+    picked up by the microphone. begin() when playback starts and end() once
+    it has finished; capture positions between the two are muted, while
+    audio from before begin() (the user already talking) is kept. Call it
+    with a range of capture positions to ask whether any of it is muted.
+
+    Args:
+        ring: The capture buffer positions refer to
+        tail: Samples still muted after end(), for sound that was in flight
+            through the output and input buffers when playback finished
+    """
+
+    def __init__(self, ring: AudioRingBuffer, tail: int = 2400):
+        self.ring = ring
+        self.tail = tail
+        self.active = False
+        self._from = 0  # Capture positions of the last muted stretch
+        self._until: Optional[int] = 0  # None while playback is still running
+
+    def begin(self):
+        self._from = self.ring.written
+        self._until = None
+        self.active = True
+
+    def end(self):
+        self._until = self.ring.written + self.tail
+        self.active = False
+
+    def __call__(self, start: int, end: int) -> bool:
+        until = self._until
+        return end > self._from and (until is None or start < until)
+
+
+def rms_int16(samples: np.ndarray) -> float:
+    """RMS energy of int16 samples, on the same scale as audioop.rms"""
+    if samples.size == 0:
+        return 0.0
+    x = samples.astype(np.float64)
+    return float(np.sqrt(np.dot(x, x) / x.size))
+
+
+class Endpointer:
+    """Streaming speech endpointer over fixed-size frames from a RingReader.
+
+    Each frame is classified by `is_speech` (WebRTC VAD or an energy test).
+    Speech starts once `onset_ratio` of the last `onset_frames` frames are
+    voiced, and the utterance is returned as soon as `hangover` seconds of
+    unvoiced frames follow it or `max_utterance` seconds have been captured.
+    """
+
+    def __init__(self, is_speech, sample_rate: int = 16000, frame_size: int = 480,
+                 hangover: float = 0.6, max_utterance: Optional[float] = 15.0,
+                 pre_roll: float = 0.5, onset_frames: int = 1, onset_ratio: float = 1.0,
+                 trailing_keep: float = 0.2):
+        self.is_speech = is_speech
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.hangover_frames = max(1, int(np.ceil(hangover * sample_rate / frame_size)))
+        self.max_samples = int(max_utterance * sample_rate) if max_utterance else None
+        self.pre_roll_samples = int(pre_roll * sample_rate)
+        self.onset_frames = max(1, onset_frames)
+        self.onset_needed = max(1, int(np.ceil(onset_ratio * self.onset_frames)))
+        self.trailing_keep_frames = int(trailing_keep * sample_rate / frame_size)
+        self.end_reason = None  # "silence", "max_length" or "stream" after capture()
+
+    def capture(self, reader: RingReader, timeout: Optional[float] = None,
+                out: Optional[PcmBuffer] = None,
+                muted: Optional[Callable[[int, int], bool]] = None,
+                on_onset: Optional[Callable[[], None]] = None) -> Optional[PcmBuffer]:
+        """Record one utterance starting at the reader's position.
+
+        Up to `pre_roll` seconds from before the onset are taken from the ring
+        buffer, but never from before the reader's starting position (e.g. the
+        end of the wake keyword). Audio is written directly into `out`, which
+        is reused when given and also bounds the utterance length.
+
+        `muted(start, end)` marks frames to discard (e.g. a PlaybackMute while
+        the assistant is talking): they are never speech, silence or pre-roll,
+        and the timeout only starts counting once they stop. `on_onset` is
+        called once speech starts.
+
+        Returns:
+            The filled PcmBuffer, or None if speech didn't start before `timeout`
+        """
+        self.end_reason = None
+        if out is None:
+            capacity = reader.ring.capacity
+            if self.max_samples:
+                capacity = min(capacity, self.pre_roll_samples + self.max_samples
+                               + self.frame_size * (self.onset_frames + 1))
+            out = PcmBuffer(capacity, self.sample_rate)
+        out.clear()
+        floor = reader.position
+        deadline = time.monotonic() + timeout if timeout else None
+
+        # Wait for speech onset
+        frame = np.empty(self.frame_size, dtype=np.int16)
+        recent = deque(maxlen=self.onset_frames)
+        while True:
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not reader.read_into(frame, timeout=wait):
+                return None
+            if muted is not None and muted(reader.position - self.frame_size, reader.position):
+                recent.clear()
+                floor = reader.position
+                if timeout:
+                    deadline = time.monotonic() + timeout
+                continue
+            recent.append(bool(self.is_speech(frame)))
+            if sum(recent) >= self.onset_needed:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+
+        if on_onset is not None:
+            on_onset()
+
+        # Splice the buffered pre-roll onto the front of the onset window
+        onset = reader.position - self.frame_size * len(recent)
+        start = max(onset - self.pre_roll_samples, floor, reader.ring.oldest)
+        try:
+            out.append_from_ring(reader.ring, start, reader.position - start)
+        except IndexError:
+            out.append(frame)
+
+        # Record in place until the hangover of trailing silence or the length limit
+        silent = 0
+        while True:
+            if out.free < self.frame_size:
+                self.end_reason = "max_length"
+                break
+            dest = out.pcm[out.length:out.length + self.frame_size]
+            if not reader.read_into(dest, timeout=1.0):
+                self.end_reason = "stream"
+                break
+            if muted is not None and muted(reader.position - self.frame_size, reader.position):
+                continue  # Overwritten by the next frame
+            out.length += self.frame_size
+            if self.is_speech(dest):
+                silent = 0
+            else:
+                silent += 1
+                if silent >= self.hangover_frames:
+                    self.end_reason = "silence"
+                    break
+            if self.max_samples and reader.position - onset >= self.max_samples:
+                self.end_reason = "max_length"
+                break
+
+        # Drop most of the trailing silence
+        drop = max(0, silent - self.trailing_keep_frames) * self.frame_size
+        out.length = max(min(out.length, self.frame_size), out.length - drop)
+        return out
+
+
+def record_phrase(reader: RingReader, sample_rate: int, energy_threshold: float,
+                  timeout: Optional[float] = None, phrase_time_limit: Optional[float] = None,
+                  pause_threshold: float = 0.8, non_speaking_duration: float = 0.5,
+                  pre_roll: float = 0.5, frame_size: int = 512,
+                  out: Optional[PcmBuffer] = None,
+                  muted: Optional[Callable[[int, int], bool]] = None,
+                  on_onset: Optional[Callable[[], None]] = None) -> Optional[PcmBuffer]:
+    """Energy-based phrase recorder reading from a shared ring buffer.
+
+    Mirrors speech_recognition.Recognizer.listen: waits for energy above the
+    threshold and stops after `pause_threshold` seconds of quiet or
+    `phrase_time_limit` seconds of audio.
+
+    Returns:
+        PcmBuffer holding the phrase, or None if nothing started before `timeout`
+    """
+    endpointer = Endpointer(
+        lambda frame: rms_int16(frame) > energy_threshold,
+        sample_rate=sample_rate,
+        frame_size=frame_size,
+        hangover=pause_threshold,
+        max_utterance=phrase_time_limit,
+        pre_roll=pre_roll,
+        trailing_keep=non_speaking_duration,
+    )
+    return endpointer.capture(reader, timeout, out, muted, on_onset)
@@ -0,0 +1,224 @@
+"""
+Gapless audio playback
+
+AudioPlayer keeps one sounddevice OutputStream open for the life of the
+assistant. Callers append float32 blocks to a queue and the stream callback
+pulls from it, so synthesis of the next chunk overlaps playback of the
+current one and no stream is opened or torn down between chunks.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+
+class AudioPlayer:
+    """Persistent mono float32 output stream fed from a queue.
+
+    The queue is a deque: append() from producers and popleft() in the audio
+    callback are atomic, so the callback never takes a lock.
+
+    Args:
+        sample_rate: Output sample rate
+        device: sounddevice output device index (None = default)
+        block_size: Frames per callback
+        latency_history: Number of per-utterance latencies kept
+        simulate: Consume audio in real time without opening a sound device
+    """
+
+    def __init__(self, sample_rate: int, device: Optional[int] = None, block_size: int = 1024,
+                 latency_history: int = 50, simulate: bool = False):
+        self.sample_rate = sample_rate
+        self.device = device
+        self.block_size = block_size
+        self.simulate = simulate
+        self.underruns = 0  # Times playback ran dry in the middle of an utterance
+        self.device_underflows = 0  # Output underflows reported by PortAudio
+        self.utterances = 0
+        self.latencies: deque = deque(maxlen=latency_history)  # Seconds from begin() to first sample
+        self._queue: deque = deque()
+        self._current: Optional[np.ndarray] = None
+        self._offset = 0
+        self._open = False  # An utterance is still producing audio
+        self._begun_at: Optional[float] = None
+        self.first_audio_at: Optional[float] = None  # perf_counter() of the last utterance's first sample
+        self._starving = False
+        self._flush = False
+        self._drained = threading.Event()
+        self._drained.set()
+        self._stream = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    @property
+    def last_latency(self) -> Optional[float]:
+        return self.latencies[-1] if self.latencies else None
+
+    def start(self):
+        """Open the output stream (idempotent)"""
+        if self._stream is not None:
+            return
+        if self.simulate:
+            self._stream = _SimulatedOutputStream(self.sample_rate, self.block_size, self._callback)
+            self._stream.start()
+            return
+        import sounddevice as sd
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.block_size,
+            channels=1,
+            dtype="float32",
+            device=self.device,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def close(self):
+        """Stop and close the output stream"""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        self._drained.set()
+
+    def begin(self):
+        """Start an utterance; its playback latency is measured from here"""
+        self.start()
+        self.utterances += 1
+        self._begun_at = time.perf_counter()
+        self._open = True
+
+    def write(self, audio: np.ndarray):
+        """Queue audio for playback (returns immediately)"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32).reshape(-1)
+        if audio.size == 0:
+            return
+        self.start()
+        self._queue.append(audio)
+        # Cleared after queueing: if the callback drains it first, the next
+        # callback sets the event again
+        self._drained.clear()
+
+    def end(self):
+        """No more audio for the current utterance; running dry is no longer an underrun"""
+        self._open = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued has been played"""
+        if not self._drained.wait(timeout):
+            return False
+        # The last block is still in the device buffer when the queue empties
+        if self._stream is not None:
+            time.sleep(self._stream.latency)
+        return True
+
+    def play(self, audio: np.ndarray, blocking: bool = True):
+        """Play one complete sound as its own utterance"""
+        self.begin()
+        self.write(audio)
+        self.end()
+        if blocking:
+            self.wait()
+
+    def stop(self):
+        """Drop everything queued and silence output"""
+        self._open = False
+        self._queue.clear()
+        self._flush = True
+        self._drained.set()
+
+    def stats(self) -> dict:
+        latencies: List[float] = list(self.latencies)
+        return {
+            "utterances": self.utterances,
+            "underruns": self.underruns,
+            "device_underflows": self.device_underflows,
+            "last_latency": self.last_latency,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        last = f"{stats['last_latency'] * 1000:.0f} ms" if stats["last_latency"] is not None else "-"
+        mean = f"{stats['mean_latency'] * 1000:.0f} ms" if stats["mean_latency"] is not None else "-"
+        return (f"Playback: {stats['utterances']} utterance(s), latency last {last} / mean {mean}, "
+                f"{stats['underruns']} underrun(s), {stats['device_underflows']} device underflow(s)")
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status and status.output_underflow:
+            self.device_underflows += 1
+        out = outdata[:, 0]
+        if self._flush:
+            self._flush = False
+            self._current = None
+
+        filled = 0
+        while filled < frames:
+            if self._current is None:
+                try:
+                    self._current = self._queue.popleft()
+                except IndexError:
+                    break
+                self._offset = 0
+            n = min(frames - filled, len(self._current) - self._offset)
+            out[filled:filled + n] = self._current[self._offset:self._offset + n]
+            filled += n
+            self._offset += n
+            if self._offset >= len(self._current):
+                self._current = None
+        out[filled:] = 0
+
+        if filled:
+            self._starving = False
+            if self._begun_at is not None:
+                self.first_audio_at = time.perf_counter()
+                self.latencies.append(self.first_audio_at - self._begun_at)
+                self._begun_at = None
+        if filled < frames and self._open and not self._starving and self._begun_at is None:
+            # Ran dry mid-utterance: synthesis didn't keep up
+            self.underruns += 1
+            self._starving = True
+        if self._current is None and not self._queue and not self._open:
+            self._drained.set()
+
+
+class _SimulatedOutputStream:
+    """Stand-in for sd.OutputStream that runs the callback at the real-time block rate"""
+
+    latency = 0.0
+
+    def __init__(self, sample_rate: int, block_size: int, callback):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="simulated-output")
+        self._thread.start()
+
+    def _loop(self):
+        period = self.block_size / self.sample_rate
+        buffer = np.zeros((self.block_size, 1), dtype=np.float32)
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            self.callback(buffer, self.block_size, None, None)
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        pass
@@ -8,6 +8,13 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = "gemini-2.5-flash"
 
+# LLM backend: gemini, or local (a deterministic stand-in for benchmarks/tests
+# that replays canned replies from LOCAL_LLM_SCRIPT, a JSON list or dict)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LOCAL_LLM_SCRIPT = os.getenv("LOCAL_LLM_SCRIPT", "")
+LOCAL_LLM_TTFT_MS = int(os.getenv("LOCAL_LLM_TTFT_MS", "400"))  # Time to first token
+LOCAL_LLM_CHUNK_MS = int(os.getenv("LOCAL_LLM_CHUNK_MS", "60"))  # Delay between chunks
+
 # Audio Configuration
 SAMPLE_RATE = 16000
 CHUNK_SIZE = 1024
@@ -18,7 +25,20 @@ MICROPHONE_INDEX = os.getenv("MICROPHONE_INDEX", None)
 if MICROPHONE_INDEX is not None:
     MICROPHONE_INDEX = int(MICROPHONE_INDEX)
 
-# Porcupine microphone selection (may differ from MICROPHONE_INDEX)
+# Shared capture ring buffer length in seconds (all listeners read from it)
+CAPTURE_BUFFER_SECONDS = float(os.getenv("CAPTURE_BUFFER_SECONDS", "30"))
+
+# Audio kept from before speech onset so command capture starts at the wake word
+PRE_ROLL_SECONDS = float(os.getenv("PRE_ROLL_SECONDS", "1.5"))
+
+# Background noise-floor tracking: sliding window length, the RMS percentile
+# taken as the floor, and the multiple of the floor that counts as speech
+NOISE_FLOOR_WINDOW_S = float(os.getenv("NOISE_FLOOR_WINDOW_S", "10"))
+NOISE_FLOOR_PERCENTILE = float(os.getenv("NOISE_FLOOR_PERCENTILE", "20"))
+NOISE_FLOOR_RATIO = float(os.getenv("NOISE_FLOOR_RATIO", "1.5"))
+
+# Porcupine microphone selection for the PvRecorder-based tools in tools/
+# (the assistant itself feeds Porcupine from the shared capture buffer)
 PORCUPINE_MICROPHONE_INDEX = os.getenv("PORCUPINE_MICROPHONE_INDEX", None)
 if PORCUPINE_MICROPHONE_INDEX is not None and PORCUPINE_MICROPHONE_INDEX != "":
     PORCUPINE_MICROPHONE_INDEX = int(PORCUPINE_MICROPHONE_INDEX)
@@ -40,12 +60,30 @@ PORCUPINE_SENSITIVITY = float(os.getenv("PORCUPINE_SENSITIVITY", "0.5"))
 WAKE_WORDS_DIR = "wake_words"  # Directory containing .ppn wake word files
 
 # Speech Recognition Configuration
-SPEECH_RECOGNITION_ENGINE = os.getenv("SPEECH_RECOGNITION_ENGINE", "auto")  # auto, whisper, google
+# auto, faster-whisper, whisper, google; append "-streaming" to a local engine
+# (e.g. whisper-streaming) to transcribe while the command is being spoken
+SPEECH_RECOGNITION_ENGINE = os.getenv("SPEECH_RECOGNITION_ENGINE", "auto").lower()
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
+# Whisper decoding: 'short' decodes the real-length mel once with no temperature
+# fallback, 'full' runs transcribe() on a padded 30 s window, 'auto' picks
+# 'short' for utterances up to WHISPER_SHORT_MAX_SECONDS
+WHISPER_DECODE_MODE = os.getenv("WHISPER_DECODE_MODE", "auto").lower()  # auto, short, full
+WHISPER_SHORT_MAX_SECONDS = float(os.getenv("WHISPER_SHORT_MAX_SECONDS", "10"))
+# faster-whisper (CTranslate2): compute type (auto = int8 on CPU, float16 on GPU;
+# or int8, int8_float16, float16, float32) and CPU threads (0 = library default)
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "auto").lower()
+FASTER_WHISPER_CPU_THREADS = int(os.getenv("FASTER_WHISPER_CPU_THREADS", "0"))
+# Streaming engines: re-decode the growing command this often (milliseconds)
+STREAMING_STT_INTERVAL_MS = int(os.getenv("STREAMING_STT_INTERVAL_MS", "300"))
 
 # Voice Activity Detection
 VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
 VAD_SENSITIVITY = int(os.getenv("VAD_SENSITIVITY", "3"))  # 0-3, higher = more sensitive
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))  # 10, 20 or 30 ms frames
+if VAD_FRAME_MS not in (10, 20, 30):
+    VAD_FRAME_MS = 30
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "600"))  # Trailing silence that ends an utterance
+VAD_MAX_UTTERANCE_S = float(os.getenv("VAD_MAX_UTTERANCE_S", "15"))  # Hard cap on command length
 
 # GPU Configuration
 USE_GPU = os.getenv("USE_GPU", "auto")  # auto, true, false
@@ -57,9 +95,66 @@ USE_FP16 = None
 # Streaming Configuration
 ENABLE_STREAMING = os.getenv("ENABLE_STREAMING", "true").lower() == "true"
 
+# Opt-in cache of LLM replies for repeated questions, keyed by personality and
+# the normalized transcript (plus the last exchange for follow-ups); persisted to LLM_CACHE_PATH
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_responses.json")
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+
+# Conversation history: turns sent verbatim with each request and the token
+# budget for them plus the running summary older turns are folded into
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "2000"))
+
+# Pre-rendered canned responses (wake acknowledgments, farewells, ...) per
+# personality/engine/voice/speed, stored as .npy files
+PHRASE_CACHE_ENABLED = os.getenv("PHRASE_CACHE_ENABLED", "true").lower() == "true"
+PHRASE_CACHE_DIR = os.getenv("PHRASE_CACHE_DIR", "cache/phrases")
+
+# On-disk cache of synthesized replies (compressed PCM, least recently used
+# entries evicted past the size cap)
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "cache/tts")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "200"))
+
+# Per-utterance STT log (JSONL), written in the background and rotated by
+# size and/or day; only the newest UTTERANCE_LOG_BACKUPS segments are kept
+UTTERANCE_LOG_PATH = os.getenv("UTTERANCE_LOG_PATH", "logs/utterances.log")
+UTTERANCE_LOG_MAX_MB = float(os.getenv("UTTERANCE_LOG_MAX_MB", "10"))
+UTTERANCE_LOG_ROTATE_DAILY = os.getenv("UTTERANCE_LOG_ROTATE_DAILY", "true").lower() == "true"
+UTTERANCE_LOG_BACKUPS = int(os.getenv("UTTERANCE_LOG_BACKUPS", "7"))
+UTTERANCE_LOG_COMPRESS = os.getenv("UTTERANCE_LOG_COMPRESS", "true").lower() == "true"
+
+# Per-stage turn latency: samples kept per stage for p50/p95/p99, and where
+# the summary is written by the tuner's "latency" command and at exit
+LATENCY_HISTORY = int(os.getenv("LATENCY_HISTORY", "1000"))
+LATENCY_REPORT_PATH = os.getenv("LATENCY_REPORT_PATH", "logs/latency.json")
+
+# Startup: number of subsystems initialized in parallel
+STARTUP_WORKERS = int(os.getenv("STARTUP_WORKERS", "4"))
+
 # Plugin Configuration
 PLUGINS_ENABLED = os.getenv("PLUGINS_ENABLED", "true").lower() == "true"
 PLUGINS_DIR = "plugins"
+# Plugins run on a worker pool; one that misses its deadline (manifest
+# "timeout", else PLUGIN_TIMEOUT_S) is abandoned and the LLM answers instead.
+# A filler phrase is spoken if a plugin is still working after the delay.
+PLUGIN_WORKERS = int(os.getenv("PLUGIN_WORKERS", "4"))
+PLUGIN_TIMEOUT_S = float(os.getenv("PLUGIN_TIMEOUT_S", "3"))
+PLUGIN_FILLER_DELAY_S = float(os.getenv("PLUGIN_FILLER_DELAY_S", "0.8"))
+
+# Pending timers are saved here and restored on the next start
+TIMER_STORE_PATH = os.getenv("TIMER_STORE_PATH", "data/timers.json")
+
+# Weather plugin: service root (point at tools/weather_standin.py for tests),
+# how long reports stay fresh / may be served stale while refreshing, and
+# comma-separated home locations prefetched in the background
+WEATHER_BASE_URL = os.getenv("WEATHER_BASE_URL", "https://wttr.in")
+WEATHER_CACHE_TTL_S = float(os.getenv("WEATHER_CACHE_TTL_S", "600"))
+WEATHER_STALE_TTL_S = float(os.getenv("WEATHER_STALE_TTL_S", "3600"))
+WEATHER_NEGATIVE_TTL_S = float(os.getenv("WEATHER_NEGATIVE_TTL_S", "300"))  # Unknown locations
+WEATHER_HOME_LOCATIONS = [loc.strip() for loc in os.getenv("WEATHER_HOME_LOCATIONS", "").split(",") if loc.strip()]
 
 def find_wake_word_file(wake_word_text):
     """Find the .ppn file for a given wake word text"""
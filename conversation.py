@@ -0,0 +1,133 @@
+"""
+Bounded conversation history
+
+Only the most recent turns are sent to the LLM verbatim. Older turns are
+folded into a running summary in the background, so the context sent with
+each request stays within a fixed turn/token budget however long the
+assistant has been running.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+Turn = Tuple[str, str]  # (user text, model reply)
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a voice assistant. "
+    "Keep names, facts, preferences and open requests; drop small talk. "
+    "Reply with the updated summary only, in a few sentences.\n\n"
+    "Current summary:\n{summary}\n\nNew turns:\n{turns}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+class ConversationHistory:
+    """Recent turns plus a rolling summary of everything older.
+
+    Args:
+        summarize: Function taking a prompt and returning summary text; when
+            None, old turns are simply dropped
+        max_turns: Turns kept verbatim
+        max_tokens: Token budget for summary plus verbatim turns
+    """
+
+    def __init__(self, summarize: Optional[Callable[[str], str]] = None,
+                 max_turns: int = 6, max_tokens: int = 2000):
+        self.summarize = summarize
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary = ""
+        self.summarized_turns = 0  # Turns folded into the summary so far
+        self._turns: List[Turn] = []
+        self._folding: List[Turn] = []  # Being summarized; still sent verbatim until done
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def turns(self) -> int:
+        """Turns currently sent verbatim"""
+        with self._lock:
+            return len(self._folding) + len(self._turns)
+
+    @property
+    def context_tokens(self) -> int:
+        """Estimated tokens of history sent with each request"""
+        with self._lock:
+            return self._tokens(self._folding + self._turns)
+
+    def _tokens(self, turns: List[Turn]) -> int:
+        total = estimate_tokens(self.summary)
+        for user, reply in turns:
+            total += estimate_tokens(user) + estimate_tokens(reply)
+        return total
+
+    def contents(self, user_input: str) -> List[Dict]:
+        """Request contents: summary, recent turns, then the new user message"""
+        with self._lock:
+            turns = self._folding + self._turns
+            summary = self.summary
+        contents = []
+        if summary:
+            contents.append({"role": "user", "parts": [f"Summary of our conversation so far: {summary}"]})
+            contents.append({"role": "model", "parts": ["Understood."]})
+        for user, reply in turns:
+            contents.append({"role": "user", "parts": [user]})
+            contents.append({"role": "model", "parts": [reply]})
+        contents.append({"role": "user", "parts": [user_input]})
+        return contents
+
+    def last_exchange(self) -> str:
+        """The most recent turn as plain text ("" when there is none yet)"""
+        with self._lock:
+            turns = self._folding + self._turns
+        if not turns:
+            return ""
+        user, reply = turns[-1]
+        return f"User: {user}\nAssistant: {reply}"
+
+    def add(self, user_input: str, reply: str):
+        """Record a completed turn and fold old turns if over budget"""
+        with self._lock:
+            self._turns.append((user_input, reply))
+            if self._thread is not None and self._thread.is_alive():
+                return  # The next add() folds whatever is still over budget
+            overflow = []
+            while self._turns and (
+                len(self._turns) > self.max_turns
+                or (len(self._turns) > 1 and self._tokens(self._turns) > self.max_tokens)
+            ):
+                overflow.append(self._turns.pop(0))
+            if not overflow:
+                return
+            self._folding = overflow
+        self._thread = threading.Thread(target=self._fold, args=(overflow,), daemon=True,
+                                        name="history-summary")
+        self._thread.start()
+
+    def _fold(self, turns: List[Turn]):
+        summary = self.summary
+        if self.summarize is not None:
+            text = "\n".join(f"User: {user}\nAssistant: {reply}" for user, reply in turns)
+            try:
+                summary = self.summarize(SUMMARY_PROMPT.format(summary=summary or "(none)", turns=text)).strip()
+            except Exception as e:
+                print(f"\n⚠️  Could not summarize conversation history: {e}")
+        with self._lock:
+            self.summary = summary
+            self.summarized_turns += len(turns)
+            self._folding = []
+
+    def clear(self):
+        with self._lock:
+            self._turns = []
+            self._folding = []
+            self.summary = ""
+            self.summarized_turns = 0
+
+    def describe(self) -> str:
+        return (f"{self.turns} recent turn(s), ~{self.context_tokens} tokens "
+                f"({self.summarized_turns} older turn(s) summarized)")
@@ -0,0 +1,122 @@
+"""
+Per-stage latency instrumentation
+
+Each turn is timestamped at fixed points (wake, capture, STT, plugin
+dispatch, LLM request, first token, first audio, playback end). When the
+turn finishes, the spans between those points go into rolling sample
+windows, from which p50/p95/p99 are computed on demand. Marking a stage
+costs a perf_counter() call and a dict store.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# (span, from stage, to stage). Stages: wake, capture_start, capture_end,
+# stt_start, stt_end, plugin_start, plugin_end, llm_request, first_token,
+# first_audio, playback_end
+SPANS = (
+    ("wake_to_speech", "wake", "capture_start"),
+    ("capture", "capture_start", "capture_end"),
+    ("stt", "stt_start", "stt_end"),
+    ("plugin", "plugin_start", "plugin_end"),
+    ("llm_first_token", "llm_request", "first_token"),
+    ("first_token_to_audio", "first_token", "first_audio"),
+    ("response", "capture_end", "first_audio"),  # End of speech to first audible reply
+    ("playback", "first_audio", "playback_end"),
+    ("turn", "capture_start", "playback_end"),
+)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    index = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, index))]
+
+
+class LatencyTracker:
+    """Stage timestamps for the current turn plus rolling per-span samples.
+
+    Args:
+        history: Samples kept per span
+    """
+
+    def __init__(self, history: int = 1000):
+        self.history = history
+        self.turns = 0
+        self._samples: Dict[str, deque] = {name: deque(maxlen=history) for name, _, _ in SPANS}
+        self._turn: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def start_turn(self):
+        """Begin a turn; a wake mark made just before it is kept"""
+        with self._lock:
+            wake = self._turn.get("wake") if self._turn and len(self._turn) == 1 else None
+            self._turn = {"wake": wake} if wake is not None else {}
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        """Timestamp a stage of the current turn (at: a perf_counter() value, default now)"""
+        at = time.perf_counter() if at is None else at
+        with self._lock:
+            if stage == "wake":
+                self._turn = {"wake": at}
+            elif self._turn is not None:
+                self._turn.setdefault(stage, at)
+
+    def finish_turn(self):
+        """Record the finished turn's spans"""
+        with self._lock:
+            turn, self._turn = self._turn, None
+            if not turn:
+                return
+            self.turns += 1
+            for name, start, end in SPANS:
+                if start in turn and end in turn and turn[end] >= turn[start]:
+                    self._samples[name].append(turn[end] - turn[start])
+
+    def record(self, span: str, seconds: float):
+        """Add a sample for a span measured elsewhere"""
+        with self._lock:
+            self._samples.setdefault(span, deque(maxlen=self.history)).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-span count, p50/p95/p99 and max, in milliseconds"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items() if values}
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1),
+            }
+            for name, values in samples.items()
+        }
+
+    def format_report(self) -> str:
+        summary = self.summary()
+        if not summary:
+            return "Latency: no completed turns yet"
+        lines = [f"Latency, {self.turns} turn(s) measured (ms):",
+                 f"   {'stage':<22}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for name, s in summary.items():
+            lines.append(f"   {name:<22}{s['count']:>6}{s['p50_ms']:>9.0f}{s['p95_ms']:>9.0f}"
+                         f"{s['p99_ms']:>9.0f}{s['max_ms']:>9.0f}")
+        return "\n".join(lines)
+
+    def dump(self, path: Optional[str] = None):
+        """Print the report and, if path is given, write the summary there as JSON"""
+        print(self.format_report())
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"turns": self.turns, "spans": self.summary()}, f, indent=2)
+        except OSError as e:
+            print(f"⚠️  Could not write latency report: {e}")
@@ -0,0 +1,140 @@
+"""
+LLM clients
+
+The assistant talks to its language model through a small interface
+(generate, stream, summarize) so the backend can be swapped. GeminiClient is
+the real thing; LocalLLMClient is a deterministic stand-in that replays
+canned or scripted replies with a configurable time-to-first-token and
+inter-chunk delay, for benchmarking and testing without network access.
+"""
+
+import json
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Union
+
+
+def last_user_text(contents: List[Dict]) -> str:
+    """Text of the final user message in request contents"""
+    for message in reversed(contents):
+        if message.get("role") == "user":
+            return " ".join(str(part) for part in message.get("parts", []))
+    return ""
+
+
+class LLMClient:
+    """Base class for LLM backends.
+
+    contents is a list of {"role": "user"|"model", "parts": [text]} messages
+    ending with the new user message.
+    """
+
+    name = "base"
+
+    def generate(self, contents: List[Dict]) -> str:
+        """Complete reply in one call"""
+        raise NotImplementedError
+
+    def stream(self, contents: List[Dict]) -> Iterator[str]:
+        """Reply as text chunks, yielded as they arrive"""
+        yield self.generate(contents)
+
+    def summarize(self, prompt: str) -> str:
+        """One-off completion without the personality prompt (used for history summaries)"""
+        raise NotImplementedError
+
+
+class GeminiClient(LLMClient):
+    """Google Gemini via google.generativeai"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str, system_prompt: str):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name, system_instruction=system_prompt)
+        # Summaries don't need (or want) the personality prompt
+        self.summary_model = genai.GenerativeModel(model_name)
+
+    def generate(self, contents: List[Dict]) -> str:
+        return self.model.generate_content(contents).text
+
+    def stream(self, contents: List[Dict]) -> Iterator[str]:
+        for chunk in self.model.generate_content(contents, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+    def summarize(self, prompt: str) -> str:
+        return self.summary_model.generate_content(prompt).text
+
+
+DEFAULT_REPLIES = [
+    "Sure! Here's a quick answer. The first sentence arrives early, and the rest follows "
+    "a little later, just like a real streamed reply.",
+    "Happy to help. This is the local stand-in model, so every reply is canned. "
+    "It is useful for measuring latency without a network connection.",
+    "Of course. Short replies are fine too.",
+]
+
+
+class LocalLLMClient(LLMClient):
+    """Deterministic stand-in that replays canned replies with simulated latency.
+
+    Args:
+        replies: A list (replayed in order, cycling) or a dict mapping a
+            substring of the user's message to a reply ("*" is the default)
+        ttft: Seconds before the first chunk
+        chunk_delay: Seconds between chunks
+        words_per_chunk: Words per streamed chunk
+    """
+
+    name = "local"
+
+    def __init__(self, replies: Optional[Union[List[str], Dict[str, str]]] = None,
+                 ttft: float = 0.4, chunk_delay: float = 0.06, words_per_chunk: int = 3):
+        self.replies = replies or DEFAULT_REPLIES
+        self.ttft = ttft
+        self.chunk_delay = chunk_delay
+        self.words_per_chunk = max(1, words_per_chunk)
+        self.requests = 0
+
+    @classmethod
+    def from_script(cls, path: str, **options) -> "LocalLLMClient":
+        """Load replies from a JSON file holding a list or a dict"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **options)
+
+    def _reply(self, contents: List[Dict]) -> str:
+        index = self.requests
+        self.requests += 1
+        if isinstance(self.replies, dict):
+            text = last_user_text(contents).lower()
+            for pattern, reply in self.replies.items():
+                if pattern != "*" and pattern.lower() in text:
+                    return reply
+            return self.replies.get("*", f"You said: {last_user_text(contents)}")
+        return self.replies[index % len(self.replies)]
+
+    def _chunks(self, reply: str) -> List[str]:
+        words = re.findall(r"\S+\s*", reply)
+        return ["".join(words[i:i + self.words_per_chunk])
+                for i in range(0, len(words), self.words_per_chunk)]
+
+    def generate(self, contents: List[Dict]) -> str:
+        reply = self._reply(contents)
+        time.sleep(self.ttft + self.chunk_delay * max(0, len(self._chunks(reply)) - 1))
+        return reply
+
+    def stream(self, contents: List[Dict]) -> Iterator[str]:
+        chunks = self._chunks(self._reply(contents))
+        time.sleep(self.ttft)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    def summarize(self, prompt: str) -> str:
+        # Deterministic: keep the tail of the new turns
+        return prompt.rsplit("New turns:", 1)[-1].strip()[-300:]
+
@@ -0,0 +1,144 @@
+"""
+Asynchronous JSONL log writer
+
+Callers only enqueue a record; a writer thread batches records into a file
+kept open between writes, flushing every flush_interval seconds and at exit.
+The file is rotated when it passes max_bytes or the day changes, rotated
+segments can be gzip-compressed, and only the newest `backups` segments are
+kept, so the log stays bounded on long-running installs.
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from typing import Optional
+
+_STOP = object()
+
+
+class LogWriter:
+    """Bounded-queue JSONL writer with size/daily rotation.
+
+    Args:
+        path: Log file (rotated segments are written next to it)
+        max_bytes: Rotate once the file would grow past this (0 = no size limit)
+        rotate_daily: Also rotate when the date changes
+        backups: Rotated segments to keep
+        compress: gzip rotated segments
+        flush_interval: Longest time a record waits before reaching the file
+        max_queue: Records buffered before new ones are dropped
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, rotate_daily: bool = True,
+                 backups: int = 7, compress: bool = True, flush_interval: float = 1.0,
+                 max_queue: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._size = 0
+        self._day: Optional[date] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="log-writer")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: dict):
+        """Queue a record; never blocks (drops it if the writer is far behind)"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write everything queued, then stop"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= 1000:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    print(f"⚠️  Failed to write {os.path.basename(self.path)}: {e}")
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_batch(self, batch):
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode("utf-8")
+        self._open()
+        if self._should_rotate(len(data)):
+            self._rotate()
+            self._open()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.written += len(batch)
+
+    def _open(self):
+        if self._file is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        # An existing file belongs to the day it was last written
+        self._day = date.fromtimestamp(os.path.getmtime(self.path)) if self._size else date.today()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if not self._size:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return self.rotate_daily and date.today() != self._day
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        target = f"{self.path}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.path, target)
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(f"{target}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+        self.rotations += 1
+        # Timestamped names sort chronologically
+        for old in sorted(glob.glob(f"{glob.escape(self.path)}.*"))[:-self.backups or None]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
@@ -1,6 +1,3 @@
-import speech_recognition as sr
-import google.generativeai as genai
-import sounddevice as sd
 import numpy as np
 import random
 import threading
@@ -8,26 +5,75 @@ import time
 import os
 import re
 import json
+import queue
 from datetime import datetime, timezone
 from config import (
     GEMINI_API_KEY, GEMINI_MODEL, load_personality,
     WAKE_WORD_ENGINE, PORCUPINE_ACCESS_KEY, PORCUPINE_SENSITIVITY,
-    SPEECH_RECOGNITION_ENGINE, WHISPER_MODEL,
-    VAD_ENABLED, VAD_SENSITIVITY,
+    SPEECH_RECOGNITION_ENGINE, WHISPER_MODEL, WHISPER_DECODE_MODE, WHISPER_SHORT_MAX_SECONDS,
+    STREAMING_STT_INTERVAL_MS, FASTER_WHISPER_COMPUTE_TYPE, FASTER_WHISPER_CPU_THREADS,
+    VAD_ENABLED, VAD_SENSITIVITY, VAD_FRAME_MS, VAD_HANGOVER_MS, VAD_MAX_UTTERANCE_S,
     ENABLE_STREAMING, PLUGINS_ENABLED, PLUGINS_DIR,
-    MICROPHONE_INDEX, PORCUPINE_MICROPHONE_INDEX, SPEAKER_INDEX,
+    PLUGIN_WORKERS, PLUGIN_TIMEOUT_S, PLUGIN_FILLER_DELAY_S, TIMER_STORE_PATH,
+    WEATHER_BASE_URL, WEATHER_CACHE_TTL_S, WEATHER_STALE_TTL_S, WEATHER_NEGATIVE_TTL_S,
+    WEATHER_HOME_LOCATIONS,
+    UTTERANCE_LOG_PATH, UTTERANCE_LOG_MAX_MB, UTTERANCE_LOG_ROTATE_DAILY,
+    UTTERANCE_LOG_BACKUPS, UTTERANCE_LOG_COMPRESS, LATENCY_HISTORY, LATENCY_REPORT_PATH,
+    MICROPHONE_INDEX, SPEAKER_INDEX, SAMPLE_RATE, CAPTURE_BUFFER_SECONDS, PRE_ROLL_SECONDS,
+    NOISE_FLOOR_WINDOW_S, NOISE_FLOOR_PERCENTILE, NOISE_FLOOR_RATIO, STARTUP_WORKERS,
+    PERSONALITY_FILE, PHRASE_CACHE_ENABLED, PHRASE_CACHE_DIR,
+    TTS_CACHE_ENABLED, TTS_CACHE_DIR, TTS_CACHE_MAX_MB,
+    HISTORY_MAX_TURNS, HISTORY_MAX_TOKENS,
+    LLM_BACKEND, LOCAL_LLM_SCRIPT, LOCAL_LLM_TTFT_MS, LOCAL_LLM_CHUNK_MS,
+    LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_TTL_S, LLM_CACHE_MAX_ENTRIES,
     get_device, get_fp16
 )
 import config as cfg
 import sys
 from plugins import PluginManager
+from audio_capture import MicrophoneStream, NoiseFloorEstimator, Endpointer, PcmBuffer, PlaybackMute, record_phrase
+import stt_backends
+from speech_pipeline import SpeechPipeline
+from audio_output import AudioPlayer
+from phrase_cache import PhraseCache
+from tts_cache import TTSCache
+from conversation import ConversationHistory
+from llm_clients import GeminiClient, LocalLLMClient
+from response_cache import ResponseCache
+from scheduler import Scheduler
+from weather_client import WeatherClient
+from log_writer import LogWriter
+from latency import LatencyTracker
+import model_registry as models
+from startup import StartupOrchestrator
+
+# Canned response categories that are pre-rendered by the phrase cache
+CANNED_RESPONSES = ("wake_acknowledgment", "farewell", "error", "timeout")
+SLEEP_MESSAGE = "Going to sleep mode. Wake me when you need me!"
+# Spoken while a slow plugin is still working
+PLUGIN_FILLER = "One moment."
+# How long to wait for speech right after the wake word before acknowledging
+WAKE_ACK_DELAY_S = 0.4
 
 class VoiceAssistant:
-    def __init__(self, personality_path=None):
+    def __init__(self, personality_path=None, audio_input=True, simulate_output=False):
+        """
+        Args:
+            personality_path: Personality JSON (default PERSONALITY_FILE)
+            audio_input: Set up microphone, wake word and speech recognition;
+                False gives a text-only assistant (used by the benchmark), for
+                which a TTS engine is optional
+            simulate_output: Consume speech in real time without a sound device
+        """
         # Load personality
+        self.personality_path = personality_path or PERSONALITY_FILE
         self.personality = load_personality(personality_path)
         self.wake_word = self.personality["wake_word"].lower()
         self.is_awake = False
+        # Where command capture should begin after a wake (buffer position),
+        # or a command already heard in the same breath as the wake word
+        self.command_start = None
+        self.pending_command = None
         # Normalize language codes for Whisper and Google
         raw_lang = self.personality.get("voice", {}).get("language", "en")
         # Whisper expects short codes like 'en', Google prefers region codes like 'en-US'
@@ -41,78 +87,110 @@ class VoiceAssistant:
         self.lang_whisper = primary
         self.lang_google = f"{primary}-{region}" if region else primary
         
-        # Setup device (CPU/GPU)
-        self.device = get_device()
-        print(f"🖥️  Using device: {self.device.upper()}")
-        # Decide whether to use fp16 based on config.auto or override
-        try:
-            self.use_fp16 = get_fp16()
-        except Exception:
-            self.use_fp16 = False
-        print(f"  Using fp16: {self.use_fp16}")
-        
-        # Initialize wake word detection
-        self.wake_engine = None
-        self.wake_type = None
-        self._initialize_wake_word()
-        
-        # Initialize speech recognizer
-        self.recognizer = sr.Recognizer()
-        # Start with a reasonable fixed threshold but allow dynamic adjustment
-        # so short commands after the wake word are captured reliably.
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
-        
-        # Initialize microphone with specific device if configured
-        if MICROPHONE_INDEX is not None:
-            self.microphone = sr.Microphone(device_index=MICROPHONE_INDEX)
-            print(f"🎤 Using microphone #{MICROPHONE_INDEX}")
-        else:
-            self.microphone = sr.Microphone()
-            print("🎤 Using default microphone")
-        
-        # Initialize speech recognition engine
-        self.stt_engine = None
-        self.stt_type = None
-        self._initialize_speech_recognition()
-        
-        # Initialize VAD if enabled
-        self.vad_model = None
-        if VAD_ENABLED:
-            self._initialize_vad()
-
         # Silence detection thresholds (can be tuned at runtime)
         # Default: more sensitive than before to catch quieter speech
         self.silence_rms_threshold = 5e-6
         self.silence_peak_threshold = 1e-5
-
-        # Start interactive tuner if running in a TTY (allow runtime tuning)
-        try:
-            if sys.stdin and sys.stdin.isatty():
-                self._start_interactive_tuner()
-        except Exception:
-            pass
         
-        # Initialize Gemini with personality
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(
-            GEMINI_MODEL,
-            system_instruction=self.personality["system_prompt"]
+        # Open the shared microphone capture. Wake word detection, command
+        # recording and calibration all read from its ring buffer.
+        self.mic_stream = MicrophoneStream(
+            device_index=MICROPHONE_INDEX,
+            sample_rate=SAMPLE_RATE,
+            buffer_seconds=CAPTURE_BUFFER_SECONDS
+        )
+        # Background noise-floor tracking replaces blocking ambient calibration
+        self.noise_floor = NoiseFloorEstimator(
+            sample_rate=SAMPLE_RATE,
+            block_size=self.mic_stream.block_size,
+            window_seconds=NOISE_FLOOR_WINDOW_S,
+            percentile=NOISE_FLOOR_PERCENTILE,
+            ratio=NOISE_FLOOR_RATIO
+        )
+        # There is no echo cancellation: audio captured while the wake
+        # acknowledgment plays is kept out of command capture and the noise floor
+        self.playback_mute = PlaybackMute(self.mic_stream.buffer, tail=self.mic_stream.seconds_to_samples(0.15))
+        self.speech_started = threading.Event()  # Set when command capture hears speech
+        self.mic_stream.add_listener(self._update_noise_floor)
+        self.energy_override = None  # Fixed energy threshold set from the tuner
+        # Commands are recorded in place into one preallocated 16 kHz buffer
+        # sized for the longest command plus its pre-roll
+        self.utterance = PcmBuffer(
+            int(SAMPLE_RATE * (VAD_MAX_UTTERANCE_S + PRE_ROLL_SECONDS + 1)),
+            sample_rate=SAMPLE_RATE
         )
-        self.chat = self.model.start_chat(history=[])
         
-        # Initialize TTS with fallback
+        # Filled in by the initializers below
+        self.device = "cpu"
+        self.use_fp16 = False
+        self.wake_engine = None
+        self.wake_type = None
+        self.wake_reader = None
+        self.recognizer = None  # speech_recognition.Recognizer, created on first Google STT use
+        self.stt_backend = None  # Local STT backend; None means Google STT
+        self.stt_type = None
+        self.stt_streamer = None
+        # Called as listener(committed_text, tentative_text) while streaming STT runs
+        self.partial_listeners = []
+        self.vad_model = None
+        self.llm = None  # LLMClient (Gemini or the local stand-in)
+        self.history = None  # Recent turns plus a rolling summary of older ones
+        self.last_turn = {}  # Timings of the most recent LLM turn
+        self.latency = LatencyTracker(LATENCY_HISTORY)  # Per-stage timings of every turn
+        self.response_cache = None  # Opt-in cache of replies to repeated questions
         self.tts_engine = None
+        self.tts_handle = None
         self.tts_type = None
         self.sample_rate = 24000
-        print("🔊 Loading TTS models...")
-        self._initialize_tts()
-        
-        # Initialize plugin system
+        # One output stream for all speech, kept open so chunks play back to back
+        self.player = AudioPlayer(self.sample_rate, device=SPEAKER_INDEX, simulate=simulate_output)
+        # Background events (fired timers) announced between turns
+        self.events = queue.Queue()
+        self.scheduler = None  # Shared timer scheduler, offered to plugins
+        self.weather = None  # Cached weather lookups, offered to plugins
+        self.utterance_log = LogWriter(
+            UTTERANCE_LOG_PATH, max_bytes=int(UTTERANCE_LOG_MAX_MB * 1024 * 1024),
+            rotate_daily=UTTERANCE_LOG_ROTATE_DAILY, backups=UTTERANCE_LOG_BACKUPS,
+            compress=UTTERANCE_LOG_COMPRESS,
+        )
+        self.phrase_cache = None  # Pre-rendered canned responses
+        self.tts_cache = None  # Synthesized replies, keyed by engine/voice/speed/text
+        if TTS_CACHE_ENABLED:
+            try:
+                self.tts_cache = TTSCache(TTS_CACHE_DIR, max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024))
+            except OSError as e:
+                print(f"⚠️  TTS cache disabled: {e}")
+        self.tts_lock = threading.Lock()  # TTS models aren't shared between threads mid-utterance
         self.plugin_manager = None
+        
+        # Independent subsystems initialize concurrently. Heavy imports
+        # (torch, whisper, kokoro, google.generativeai) happen inside them.
+        startup = StartupOrchestrator(max_workers=STARTUP_WORKERS)
+        startup.add("device", self._initialize_device)
+        if audio_input:
+            startup.add("microphone", self._initialize_microphone)
+            startup.add("wake word", self._initialize_wake_word, required=False)
+            startup.add("speech recognition", self._initialize_speech_recognition, after=("device",), required=False)
+            if VAD_ENABLED:
+                startup.add("vad", self._initialize_vad, required=False)
+        startup.add("llm", self._initialize_llm)
+        startup.add("tts", self._initialize_tts, after=("device",), required=audio_input)
+        startup.add("audio output", self.player.start, required=False)
+        if PHRASE_CACHE_ENABLED:
+            startup.add("phrase cache", self._initialize_phrase_cache, after=("tts",), required=False)
         if PLUGINS_ENABLED:
-            print("🔌 Loading plugins...")
-            self.plugin_manager = PluginManager(PLUGINS_DIR)
+            startup.add("plugins", self._initialize_plugins, required=False)
+            startup.add("weather", self._initialize_weather, required=False)
+        startup.add("scheduler", self._initialize_scheduler, required=False)
+        startup.run()
+        print(startup.format_timings())
+
+        # Start interactive tuner if running in a TTY (allow runtime tuning)
+        try:
+            if sys.stdin and sys.stdin.isatty():
+                self._start_interactive_tuner()
+        except Exception:
+            pass
         
         print(f"\n✨ {self.personality['name']} initialized!")
         print(f"🎤 Wake word: '{self.wake_word}' (Engine: {self.wake_type})")
@@ -123,11 +201,85 @@ class VoiceAssistant:
         if ENABLE_STREAMING:
             print("⚡ Streaming Responses: Enabled")
         
-        print("Adjusting for ambient noise... Please wait.")
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=2)
         print("Ready to listen!")
     
+    def _initialize_device(self):
+        """Setup computation device (CPU/GPU) and fp16 mode"""
+        self.device = get_device()
+        print(f"🖥️  Using device: {self.device.upper()}")
+        # Decide whether to use fp16 based on config.auto or override
+        try:
+            self.use_fp16 = get_fp16()
+        except Exception:
+            self.use_fp16 = False
+        print(f"  Using fp16: {self.use_fp16}")
+    
+    def _initialize_microphone(self):
+        """Open the shared microphone capture"""
+        self.mic_stream.start()
+        if MICROPHONE_INDEX is not None:
+            print(f"🎤 Using microphone #{MICROPHONE_INDEX}")
+        else:
+            print("🎤 Using default microphone")
+    
+    def _initialize_llm(self):
+        """Initialize the LLM client (Gemini, or the local stand-in) and history"""
+        if LLM_BACKEND == "local":
+            options = {"ttft": LOCAL_LLM_TTFT_MS / 1000, "chunk_delay": LOCAL_LLM_CHUNK_MS / 1000}
+            if LOCAL_LLM_SCRIPT:
+                self.llm = LocalLLMClient.from_script(LOCAL_LLM_SCRIPT, **options)
+            else:
+                self.llm = LocalLLMClient(**options)
+            print("🧪 Using the local LLM stand-in")
+        else:
+            self.llm = GeminiClient(GEMINI_API_KEY, GEMINI_MODEL, self.personality["system_prompt"])
+        self.history = ConversationHistory(
+            summarize=self.llm.summarize,
+            max_turns=HISTORY_MAX_TURNS,
+            max_tokens=HISTORY_MAX_TOKENS
+        )
+        if LLM_CACHE_ENABLED:
+            self.response_cache = ResponseCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL_S,
+                                                max_entries=LLM_CACHE_MAX_ENTRIES)
+            self.response_cache.bind_personality(self.personality["name"], self.personality["system_prompt"])
+    
+    def _initialize_plugins(self):
+        """Initialize plugin system"""
+        print("🔌 Loading plugins...")
+        self.plugin_manager = PluginManager(PLUGINS_DIR, max_workers=PLUGIN_WORKERS,
+                                            timeout=PLUGIN_TIMEOUT_S, filler_delay=PLUGIN_FILLER_DELAY_S)
+    
+    def _initialize_weather(self):
+        """Weather client for the weather plugin; home locations are prefetched"""
+        self.weather = WeatherClient(WEATHER_BASE_URL, ttl=WEATHER_CACHE_TTL_S,
+                                     stale_ttl=WEATHER_STALE_TTL_S, negative_ttl=WEATHER_NEGATIVE_TTL_S,
+                                     home_locations=WEATHER_HOME_LOCATIONS)
+        self.weather.start_prefetch()
+    
+    def _initialize_scheduler(self):
+        """Start the timer scheduler; fired timers become events for the main loop"""
+        self.scheduler = Scheduler(lambda timer: self.events.put(("timer", timer)), path=TIMER_STORE_PATH)
+        self.scheduler.start()
+    
+    def _handle_events(self):
+        """Announce queued background events; called between turns so a reply is never cut off"""
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "timer":
+                label = payload.get("label") or "your"
+                if payload.get("missed"):
+                    message = f"Your {label} timer went off while I was offline."
+                else:
+                    message = f"Time's up! Your {label} timer is done."
+                print(f"\n⏰ {self.personality['name']}: {message}")
+                self.speak(message)
+                if not self.is_awake and self.wake_reader:
+                    # Don't run the wake word over our own announcement
+                    self.wake_reader.seek_live()
+    
     def _initialize_wake_word(self):
         """Initialize wake word detection engine"""
         
@@ -136,7 +288,6 @@ class VoiceAssistant:
             try:
                 print("  Trying Porcupine wake word detection...")
                 import pvporcupine
-                from pvrecorder import PvRecorder
                 
                 # Check if we have a custom wake word file
                 wake_word_file = self.personality.get("wake_word_file")
@@ -176,68 +327,71 @@ class VoiceAssistant:
                         print(f"  Available built-in keywords: {', '.join(builtin_keywords[:5])}...")
                         raise ValueError("Custom wake word file required")
                 
-                # Initialize audio recorder for Porcupine
-                try:
-                    # Use separate Porcupine microphone index if specified
-                    if PORCUPINE_MICROPHONE_INDEX is not None:
-                        self.porcupine_recorder = PvRecorder(
-                            frame_length=self.wake_engine.frame_length,
-                            device_index=PORCUPINE_MICROPHONE_INDEX
-                        )
-                        print(f"  ✓ Porcupine using microphone #{PORCUPINE_MICROPHONE_INDEX}")
-                    else:
-                        # Use default microphone
-                        self.porcupine_recorder = PvRecorder(
-                            frame_length=self.wake_engine.frame_length,
-                            device_index=-1
-                        )
-                        print("  ✓ Porcupine using default microphone")
-                    print("  ✓ Porcupine wake word detection loaded")
-                    return
-                except Exception as recorder_error:
-                    # If specified mic fails, try default
-                    if PORCUPINE_MICROPHONE_INDEX is not None:
-                        print(f"  ⚠ Failed with Porcupine mic #{PORCUPINE_MICROPHONE_INDEX}, trying default...")
-                        try:
-                            self.porcupine_recorder = PvRecorder(
-                                frame_length=self.wake_engine.frame_length,
-                                device_index=-1
-                            )
-                            print("  ✓ Porcupine wake word detection loaded (default mic)")
-                            return
-                        except Exception:
-                            pass
-                    raise recorder_error
+                # Porcupine reads frames from the shared capture buffer
+                if self.wake_engine.sample_rate != self.mic_stream.sample_rate:
+                    raise ValueError(
+                        f"Porcupine needs {self.wake_engine.sample_rate} Hz audio, "
+                        f"capture runs at {self.mic_stream.sample_rate} Hz"
+                    )
+                self.wake_reader = self.mic_stream.reader()
+                print("  ✓ Porcupine using shared microphone capture")
+                print("  ✓ Porcupine wake word detection loaded")
+                return
             
             except ImportError as e:
                 print(f"  ⚠ Porcupine not available: {e}")
                 print("  Install with: pip install pvporcupine pvrecorder")
             except Exception as e:
                 print(f"  ⚠ Porcupine initialization failed: {e}")
+                if self.wake_engine:
+                    self.wake_engine.delete()
+                    self.wake_engine = None
         
         # Fallback to built-in (online via Google STT)
         self.wake_type = "Built-in (Online STT)"
-        self.porcupine_recorder = None
         print("  ✓ Using built-in wake word detection")
     
     def _initialize_speech_recognition(self):
         """Initialize speech recognition engine"""
         
-        # Try Whisper first (offline, accurate)
-        if SPEECH_RECOGNITION_ENGINE in ["auto", "whisper"]:
+        # Try the local backends selected by SPEECH_RECOGNITION_ENGINE in order
+        names, streaming = stt_backends.parse_engine(SPEECH_RECOGNITION_ENGINE)
+        for name in names:
+            backend = stt_backends.create_backend(
+                name, WHISPER_MODEL,
+                device=self.device,
+                language=self.lang_whisper,
+                sample_rate=SAMPLE_RATE,
+                fp16=self.use_fp16,
+                decode_mode=WHISPER_DECODE_MODE,
+                short_max_seconds=WHISPER_SHORT_MAX_SECONDS,
+                compute_type=FASTER_WHISPER_COMPUTE_TYPE,
+                cpu_threads=FASTER_WHISPER_CPU_THREADS
+            )
             try:
-                print("  Trying Whisper speech recognition...")
-                import whisper
-                
-                self.stt_engine = whisper.load_model(WHISPER_MODEL, device=self.device)
-                self.stt_type = f"Whisper ({WHISPER_MODEL}) - Offline"
-                print(f"  ✓ Whisper {WHISPER_MODEL} model loaded")
-                return
-            
+                print(f"  Trying {name} speech recognition...")
+                backend.load()
+                started = time.perf_counter()
+                backend.warm_up()
+                print(f"  ✓ {backend.label} loaded (warm-up {time.perf_counter() - started:.2f}s)")
             except ImportError:
-                print("  ⚠ Whisper not available (install: pip install openai-whisper)")
+                print(f"  ⚠ {name} not available (install: {backend.install_hint})")
+                continue
             except Exception as e:
-                print(f"  ⚠ Whisper initialization failed: {e}")
+                backend.release()
+                print(f"  ⚠ {name} initialization failed: {e}")
+                continue
+            
+            self.stt_backend = backend
+            self.stt_type = f"{backend.label} - Offline"
+            if streaming:
+                # Re-decode the command while it is still being spoken
+                self.stt_streamer = backend.stream(
+                    interval=STREAMING_STT_INTERVAL_MS / 1000,
+                    on_partial=self._on_partial_transcript
+                )
+                self.stt_type = f"{backend.label} - Streaming"
+            return
         
         # Fallback to Google STT (online, free)
         self.stt_type = "Google STT (Online)"
@@ -256,11 +410,11 @@ class VoiceAssistant:
     
     def _initialize_tts(self):
         """Initialize TTS engine with fallback from Kokoro to KittenTTS"""
+        print("🔊 Loading TTS models...")
         
         # Try Kokoro first
         try:
             print("  Trying Kokoro TTS...")
-            from kokoro import KPipeline
             
             lang = self.personality["voice"].get("language", "en-us")
             lang_map = {
@@ -270,7 +424,8 @@ class VoiceAssistant:
             kokoro_lang = lang_map.get(lang.lower(), "a")
             
             self.voice_name = self.personality["voice"].get("kokoro_voice", "af_sky")
-            self.tts_engine = KPipeline(lang_code=kokoro_lang)
+            self.tts_handle = models.acquire_kokoro(kokoro_lang, self.device)
+            self.tts_engine = self.tts_handle.model
             self.tts_type = "Kokoro"
             print("  ✓ Kokoro TTS loaded successfully")
             return
@@ -283,9 +438,9 @@ class VoiceAssistant:
         # Fallback to KittenTTS
         try:
             print("  Trying KittenTTS (fallback)...")
-            from kittentts import KittenTTS
             
-            self.tts_engine = KittenTTS("KittenML/kitten-tts-nano-0.1", device=self.device)
+            self.tts_handle = models.acquire_kitten("KittenML/kitten-tts-nano-0.1", self.device)
+            self.tts_engine = self.tts_handle.model
             self.tts_type = "KittenTTS"
             
             kokoro_voice = self.personality["voice"].get("kokoro_voice", "af_sky")
@@ -306,6 +461,43 @@ class VoiceAssistant:
             "  - KittenTTS: pip install https://github.com/KittenML/KittenTTS/releases/download/0.1/kittentts-0.1.0-py3-none-any.whl"
         )
     
+    def _initialize_phrase_cache(self):
+        """Load pre-rendered canned responses and render missing ones in the background"""
+        if not self.tts_engine:
+            return
+        speed = self.personality["voice"].get("speed", "normal")
+        voice = self.voice_name if self.tts_type == "Kokoro" else self.kitten_voice
+        self.phrase_cache = PhraseCache(
+            PHRASE_CACHE_DIR,
+            lambda text: np.concatenate(list(self._synthesize(text, use_cache=False))),
+            {
+                "personality": self.personality.get("name"),
+                "engine": self.tts_type,
+                "voice": voice,
+                "speed": speed,
+                "sample_rate": self.sample_rate,
+            }
+        )
+        self.phrase_cache.build_async(self._canned_phrases(self.personality))
+        if os.path.exists(self.personality_path):
+            self.phrase_cache.watch(self.personality_path, self._reload_canned_phrases)
+    
+    def _canned_phrases(self, personality):
+        """Every static line the personality can speak, wake acknowledgments first"""
+        responses = personality.get("responses", {})
+        phrases = [self._strip_emojis(text) for kind in CANNED_RESPONSES for text in responses.get(kind, [])]
+        phrases.append(SLEEP_MESSAGE)
+        phrases.append(PLUGIN_FILLER)
+        return phrases
+    
+    def _reload_canned_phrases(self):
+        """Re-read the personality file's responses (called when the file changes)"""
+        with open(self.personality_path, "r", encoding="utf-8") as f:
+            personality = json.load(f)
+        if "responses" in personality:
+            self.personality["responses"] = personality["responses"]
+        return self._canned_phrases(self.personality)
+    
     def _map_kokoro_to_kitten_voice(self, kokoro_voice):
         """Map Kokoro voice names to KittenTTS voice IDs"""
         female_voices = {
@@ -336,77 +528,95 @@ class VoiceAssistant:
             return True  # Assume speech if VAD not available
         
         try:
-            # VAD expects 16kHz audio in chunks
-            is_speech = self.vad_model.is_speech(audio_data, 16000)
+            # VAD expects 10/20/30 ms chunks of 16-bit PCM
+            is_speech = self.vad_model.is_speech(audio_data, SAMPLE_RATE)
             return is_speech
         except Exception:
             return True
     
-    def listen(self, listening_for_wake=False):
-        """Capture audio from microphone and convert to text"""
-        try:
-            with self.microphone as source:
-                if listening_for_wake:
-                    print(f"\n💤 Sleeping... Say '{self.wake_word}' to wake me up", end="", flush=True)
-                    # Lower energy threshold for wake word detection
-                    self.recognizer.energy_threshold = 300
-                else:
-                    print("\n🎤 Listening...")
-                    # Reset to a reasonable threshold for commands
-                    self.recognizer.energy_threshold = 400
-                
-                # Longer timeout for wake word
-                if listening_for_wake:
-                    audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=5)
-                else:
-                    audio = self.recognizer.listen(source, timeout=8, phrase_time_limit=15)
-                
-            print("\r🔄 Processing speech...                                      ")
-            
-            # Use Whisper if available
-            if self.stt_engine and self.stt_type.startswith("Whisper"):
-                return self._transcribe_whisper(audio)
-            else:
-                return self._transcribe_google(audio)
-            
-        except sr.WaitTimeoutError:
+    def listen(self, listening_for_wake=False, start_position=None):
+        """Capture audio from microphone and convert to text
+
+        start_position is an absolute capture-buffer position to record from
+        (e.g. the end of the wake keyword); defaults to the live position.
+        """
+        if listening_for_wake:
+            print(f"\n💤 Sleeping... Say '{self.wake_word}' to wake me up", end="", flush=True)
+        else:
+            self.latency.start_turn()
+            print("\n🎤 Listening...")
+        
+        # Record from the shared capture buffer, keeping up to
+        # PRE_ROLL_SECONDS of audio from before the detected onset.
+        # Longer timeout for wake word.
+        reader = self.mic_stream.reader(start_position)
+        timeout = 10 if listening_for_wake else 8
+        max_length = 5 if listening_for_wake else VAD_MAX_UTTERANCE_S
+        streamer = None if listening_for_wake else self.stt_streamer
+        if streamer:
+            streamer.start(self.utterance)
+        if self.vad_model:
+            # Frame-level VAD endpointing: hand off as soon as trailing
+            # silence is confirmed instead of waiting on energy levels
+            endpointer = Endpointer(
+                lambda frame: self.detect_voice_activity(frame.tobytes()),
+                sample_rate=self.mic_stream.sample_rate,
+                frame_size=self.mic_stream.sample_rate * VAD_FRAME_MS // 1000,
+                hangover=VAD_HANGOVER_MS / 1000,
+                max_utterance=max_length,
+                pre_roll=PRE_ROLL_SECONDS,
+                onset_frames=max(1, 150 // VAD_FRAME_MS),
+                onset_ratio=0.6
+            )
+            utterance = endpointer.capture(reader, timeout=timeout, out=self.utterance,
+                                           muted=self.playback_mute, on_onset=self.speech_started.set)
+            if utterance is not None and endpointer.end_reason == "max_length":
+                print(f"  (stopped at {max_length}s utterance limit)")
+        else:
+            utterance = record_phrase(reader, self.mic_stream.sample_rate, self._energy_threshold(),
+                                      timeout=timeout, phrase_time_limit=max_length,
+                                      pre_roll=PRE_ROLL_SECONDS, out=self.utterance,
+                                      muted=self.playback_mute, on_onset=self.speech_started.set)
+        if utterance is None:
+            if streamer:
+                streamer.cancel()
             if not listening_for_wake:
                 response = self.get_random_response("timeout")
                 print(f"⏱️  {response}")
             return None
-        except sr.UnknownValueError:
-            if not listening_for_wake:
-                response = self.get_random_response("error")
-                print(f"❌ {response}")
-            return None
-        except sr.RequestError as e:
-            print(f"❌ Speech recognition error: {e}")
-            return None
+        
+        end_of_speech = time.perf_counter()
+        self.latency.mark("capture_start", at=end_of_speech - utterance.duration)
+        self.latency.mark("capture_end", at=end_of_speech)
+        print("\r🔄 Processing speech...                                      ")
+        
+        # Use the local backend if available
+        self.latency.mark("stt_start")
+        if streamer:
+            text = self._transcribe_streaming(utterance, streamer)
+        elif self.stt_backend:
+            text = self._transcribe_local(utterance)
+        else:
+            text = self._transcribe_google(utterance)
+        self.latency.mark("stt_end")
+        return text
     
-    def _transcribe_whisper(self, audio):
-        """Transcribe audio using Whisper"""
+    def _transcribe_local(self, utterance):
+        """Transcribe a captured PcmBuffer with the local STT backend"""
+        backend = self.stt_backend
         try:
-            # Convert audio bytes to float32 numpy (Whisper expects 16 kHz float32 mono)
-            wav_bytes = audio.get_wav_data(convert_rate=16000, convert_width=2)
-            audio_np = np.frombuffer(wav_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-
-            # If multi-channel, make mono
-            if audio_np.ndim > 1:
-                audio_np = np.mean(audio_np, axis=1)
+            # Capture is already 16 kHz mono; convert to float32 in place
+            audio_np = utterance.as_float32()
 
             # Quick silence check
-            peak = float(np.abs(audio_np).max()) if audio_np.size else 0.0
-            rms = float(np.sqrt(np.mean(audio_np ** 2))) if audio_np.size else 0.0
+            peak, rms = utterance.levels()
             print(f"  Audio RMS: {rms:.6f}, Peak: {peak:.6f}")
-            if audio_np.size == 0 or peak < self.silence_peak_threshold or rms < self.silence_rms_threshold:
+            if audio_np.size == 0 or peak < self.silence_peak_threshold or rms < self._silence_rms_threshold():
                 print("⚠️  No significant audio detected (silence)")
                 # Log silence event
                 self._log_utterance({
                     "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "engine": "whisper",
-                    "model": WHISPER_MODEL,
-                    "device": self.device,
-                    "fp16": bool(self.use_fp16),
+                    **backend.log_fields(),
                     "rms": rms,
                     "peak": peak,
                     "text": None,
@@ -414,27 +624,21 @@ class VoiceAssistant:
                 })
                 return None
 
-            # Use whisper's audio helpers to pad/trim to the model's expected length
-            try:
-                from whisper import audio as whisper_audio
-                audio_np = whisper_audio.pad_or_trim(audio_np)
-            except Exception:
-                # If whisper.audio helpers aren't available, proceed with raw audio
-                pass
-
-            # Use config-selected fp16 flag
-            result = self.stt_engine.transcribe(audio_np, fp16=self.use_fp16, language=self.lang_whisper)
-            text = result.get("text", "").strip()
+            started = time.perf_counter()
+            text = backend.transcribe(audio_np)
+            elapsed = time.perf_counter() - started
+            rtf = elapsed / utterance.duration if utterance.duration else None
+            print(f"  {backend.name} {backend.last_mode}: {elapsed:.2f}s for {utterance.duration:.2f}s of audio (RTF {rtf:.2f})")
 
             # Log transcription
             self._log_utterance({
                 "timestamp": datetime.now(timezone.utc).isoformat(),
-                "engine": "whisper",
-                "model": WHISPER_MODEL,
-                "device": self.device,
-                "fp16": bool(self.use_fp16),
+                **backend.log_fields(),
                 "rms": rms,
                 "peak": peak,
+                "decode_mode": backend.last_mode,
+                "duration": utterance.duration,
+                "rtf": rtf,
                 "text": text,
                 "error": None
             })
@@ -447,15 +651,12 @@ class VoiceAssistant:
             return None
 
         except Exception as e:
-            print(f"❌ Whisper transcription error: {e}")
+            print(f"❌ {backend.name} transcription error: {e}")
             # Log error
             try:
                 self._log_utterance({
                     "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "engine": "whisper",
-                    "model": WHISPER_MODEL,
-                    "device": self.device,
-                    "fp16": bool(self.use_fp16),
+                    **backend.log_fields(),
                     "rms": rms if 'rms' in locals() else None,
                     "peak": peak if 'peak' in locals() else None,
                     "text": None,
@@ -464,30 +665,107 @@ class VoiceAssistant:
             except Exception:
                 pass
             # Fallback to Google
-            return self._transcribe_google(audio)
+            return self._transcribe_google(utterance)
 
-    def _log_utterance(self, record: dict):
-        """Append a per-utterance record to logs/utterances.log as JSONL."""
+    def _transcribe_streaming(self, utterance, streamer):
+        """Finish a streaming transcription once end-of-speech is confirmed"""
+        backend = self.stt_backend
         try:
-            log_dir = os.path.join(os.getcwd(), "logs")
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, "utterances.log")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            end_of_speech = time.perf_counter()
+            peak, rms = utterance.levels()
+            print(f"  Audio RMS: {rms:.6f}, Peak: {peak:.6f}")
+            if utterance.length == 0 or peak < self.silence_peak_threshold or rms < self._silence_rms_threshold():
+                streamer.cancel()
+                print("⚠️  No significant audio detected (silence)")
+                self._log_utterance({
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    **backend.log_fields(),
+                    "rms": rms,
+                    "peak": peak,
+                    "text": None,
+                    "error": "silence"
+                })
+                return None
+
+            text = streamer.finish()
+            finalize = time.perf_counter() - end_of_speech
+            print(f"  {backend.name} streaming: final text {finalize * 1000:.0f} ms after end of speech "
+                  f"({streamer.decodes} decodes for {utterance.duration:.2f}s of audio)")
+
+            self._log_utterance({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                **backend.log_fields(),
+                "rms": rms,
+                "peak": peak,
+                "decode_mode": "streaming",
+                "duration": utterance.duration,
+                "finalize_s": finalize,
+                "decodes": streamer.decodes,
+                "text": text,
+                "error": None
+            })
+
+            if text:
+                print(f"📝 You said: {text}")
+                return text
+            print("⚠️  No speech detected")
+            return None
+
         except Exception as e:
-            print(f"⚠️  Failed to write utterance log: {e}")
+            streamer.cancel()
+            print(f"❌ {backend.name} streaming error: {e}")
+            # Fall back to a one-shot transcription of the same audio
+            return self._transcribe_local(utterance)
+
+    def _on_partial_transcript(self, committed, tentative):
+        """Show partial streaming text and pass it on to partial listeners"""
+        print(f"\r  … {committed} [{tentative}]", end="", flush=True)
+        for listener in self.partial_listeners:
+            try:
+                listener(committed, tentative)
+            except Exception as e:
+                print(f"\n⚠️  Partial transcript listener error: {e}")
+
+    def _update_noise_floor(self, block):
+        """Capture listener: track the noise floor, except while we're talking ourselves"""
+        if not self.playback_mute.active:
+            self.noise_floor.update(block)
+    
+    def _energy_threshold(self):
+        """Current speech energy threshold: tuner override, else the tracked noise floor"""
+        if self.energy_override is not None:
+            return self.energy_override
+        threshold = self.noise_floor.energy_threshold
+        return threshold if threshold is not None else 300
+
+    def _silence_rms_threshold(self):
+        """Utterances no louder overall than the background noise floor count as silence"""
+        floor = self.noise_floor.noise_floor_normalized
+        if floor is None:
+            return self.silence_rms_threshold
+        return max(self.silence_rms_threshold, floor)
+
+    def _log_utterance(self, record: dict):
+        """Queue a per-utterance record for the JSONL utterance log (written in the background)."""
+        self.utterance_log.write(record)
 
     def _start_interactive_tuner(self):
         """Start a background thread to accept simple runtime tuning commands from stdin.
 
         Commands:
           - vad <0-3>           : set VAD_SENSITIVITY
-          - energy <value>      : set recognizer.energy_threshold
+          - energy <value|auto> : fix the speech energy threshold, or track the noise floor
           - show                : show current settings
           - fp16 auto|true|false : set FP16_MODE at runtime
+          - models              : show resident models and their memory
+          - playback            : show playback latency and underrun counters
+          - cache               : show TTS, response and weather cache statistics
+          - context             : show conversation history size
+          - plugins             : show per-plugin latency and timeout counters
+          - latency             : show per-stage turn latency percentiles (also written to LATENCY_REPORT_PATH)
         """
         def tuner():
-            print("Interactive tuner: type 'show', 'vad <0-3>', 'energy <value>' or 'fp16 <auto|true|false>'")
+            print("Interactive tuner: type 'show', 'vad <0-3>', 'energy <value|auto>' or 'fp16 <auto|true|false>'")
             while True:
                 try:
                     line = sys.stdin.readline()
@@ -499,7 +777,7 @@ class VoiceAssistant:
                     parts = line.split()
                     cmd = parts[0].lower()
                     if cmd == "show":
-                        print(f"Device: {self.device}, fp16: {self.use_fp16}, VAD_SENSITIVITY: {cfg.VAD_SENSITIVITY}, energy_threshold: {self.recognizer.energy_threshold}")
+                        print(f"Device: {self.device}, fp16: {self.use_fp16}, VAD_SENSITIVITY: {cfg.VAD_SENSITIVITY}, energy_threshold: {self._energy_threshold()}, noise_floor: {self.noise_floor.noise_floor}")
                     elif cmd == "vad" and len(parts) > 1:
                         try:
                             new = int(parts[1])
@@ -510,9 +788,12 @@ class VoiceAssistant:
                             print(f"Invalid vad value: {ex}")
                     elif cmd == "energy" and len(parts) > 1:
                         try:
-                            new = int(parts[1])
-                            self.recognizer.energy_threshold = new
-                            print(f"Set energy_threshold = {self.recognizer.energy_threshold}")
+                            if parts[1].lower() == "auto":
+                                self.energy_override = None
+                                print("Energy threshold now follows the noise floor")
+                            else:
+                                self.energy_override = int(parts[1])
+                                print(f"Set energy_threshold = {self.energy_override}")
                         except Exception as ex:
                             print(f"Invalid energy value: {ex}")
                     elif cmd == "silence" and len(parts) > 1:
@@ -548,17 +829,28 @@ class VoiceAssistant:
                             cfg.setup_device()
                             self.use_fp16 = cfg.get_fp16()
                             print(f"Set FP16_MODE = {cfg.FP16_MODE}, use_fp16 = {self.use_fp16}")
-                            # Reload Whisper model to apply fp16 change (may take time)
-                            try:
-                                print("Reloading Whisper model to apply fp16 change (this may take a moment)...")
-                                self._reload_whisper_model()
-                                print("Whisper model reloaded")
-                            except Exception as e:
-                                print(f"Failed to reload Whisper model: {e}")
+                            # fp16 is applied at decode time; the shared model is reused
+                            if self.stt_backend is not None and hasattr(self.stt_backend, "fp16"):
+                                self.stt_backend.fp16 = self.use_fp16
                         else:
                             print("Invalid fp16 mode. Use auto|true|false")
+                    elif cmd == "models":
+                        print(models.registry.format_report())
+                    elif cmd == "playback":
+                        print(self.player.format_stats())
+                    elif cmd == "context":
+                        print(f"Context: {self.history.describe()}" if self.history else "No conversation yet")
+                    elif cmd == "cache":
+                        print(self.tts_cache.format_stats() if self.tts_cache else "TTS cache disabled")
+                        print(self.response_cache.format_stats() if self.response_cache else "Response cache disabled")
+                        if self.weather:
+                            print(self.weather.format_stats())
+                    elif cmd == "latency":
+                        self.latency.dump(LATENCY_REPORT_PATH)
+                    elif cmd == "plugins":
+                        print(self.plugin_manager.format_stats() if self.plugin_manager else "Plugins disabled")
                     else:
-                        print("Unknown command. Use: show, vad <0-3>, energy <value>, fp16 <auto|true|false>")
+                        print("Unknown command. Use: show, vad <0-3>, energy <value|auto>, fp16 <auto|true|false>, models, playback, cache, context, plugins, latency")
                 except Exception as e:
                     print(f"Tuner error: {e}")
                     break
@@ -566,25 +858,6 @@ class VoiceAssistant:
         thread = threading.Thread(target=tuner, daemon=True, name="interactive-tuner")
         thread.start()
 
-    def _reload_whisper_model(self):
-        """Reload the Whisper model with current device and fp16 settings."""
-        try:
-            import whisper
-            import torch
-            # free cache before reloading
-            try:
-                torch.cuda.empty_cache()
-            except Exception:
-                pass
-
-            # load model on current device
-            model = whisper.load_model(WHISPER_MODEL, device=self.device)
-            self.stt_engine = model
-            self.stt_type = f"Whisper ({WHISPER_MODEL}) - Offline"
-            # Note: fp16 behavior is passed at transcribe time via fp16 flag
-        except Exception as e:
-            print(f"⚠️  Could not reload Whisper model: {e}")
-
     def _strip_emojis(self, text: str) -> str:
         """Remove common emoji characters from a string."""
         if not isinstance(text, str):
@@ -607,11 +880,14 @@ class VoiceAssistant:
             # fallback: remove surrogate pairs
             return ''.join(ch for ch in text if ord(ch) < 0x10000)
     
-    def _transcribe_google(self, audio):
-        """Transcribe audio using Google STT"""
+    def _transcribe_google(self, utterance):
+        """Transcribe a captured PcmBuffer using Google STT"""
         try:
+            import speech_recognition as sr
+            if self.recognizer is None:
+                self.recognizer = sr.Recognizer()
             lang = getattr(self, 'lang_google', self.personality.get("voice", {}).get("language", "en"))
-            text = self.recognizer.recognize_google(audio, language=lang)
+            text = self.recognizer.recognize_google(utterance.to_audio_data(), language=lang)
             print(f"You said: {text}")
             return text
         except Exception as e:
@@ -620,48 +896,162 @@ class VoiceAssistant:
     
     def think(self, user_input):
         """Send text to Gemini and get response"""
+        self.latency.mark("llm_request")
         try:
             print("🤔 Thinking...")
             
+            cached = self._cached_reply(user_input)
+            if cached is not None:
+                return cached
+            
             if ENABLE_STREAMING:
                 return self._think_streaming(user_input)
             else:
-                response = self.chat.send_message(user_input)
-                reply = response.text
+                started = time.perf_counter()
+                reply = self.llm.generate(self.history.contents(user_input))
+                self.latency.mark("first_token")
+                elapsed = time.perf_counter() - started
+                self.last_turn = {"ttft": elapsed, "llm_total": elapsed}
                 print(f"Assistant: {reply}")
+                self._cache_reply(user_input, reply)
+                self._remember(user_input, reply)
                 return reply
         
         except Exception as e:
-            print(f"❌ Gemini error: {e}")
+            print(f"❌ LLM error: {e}")
             return "Sorry, I encountered an error processing your request."
     
-    def _think_streaming(self, user_input):
-        """Send text to Gemini and get streaming response"""
+    def _think_streaming(self, user_input, on_text=None):
+        """Send text to Gemini and get streaming response
+
+        on_text, if given, is called with each chunk of text as it arrives.
+        """
+        full_response = []
+        contents = self.history.contents(user_input)
+        started = time.perf_counter()
+        self.last_turn = {"ttft": None}
         try:
-            response = self.chat.send_message(user_input, stream=True)
-            
-            full_response = []
             print("Assistant: ", end="", flush=True)
             
-            for chunk in response:
-                if chunk.text:
-                    print(chunk.text, end="", flush=True)
-                    full_response.append(chunk.text)
+            for text in self.llm.stream(contents):
+                if self.last_turn["ttft"] is None:
+                    self.last_turn["ttft"] = time.perf_counter() - started
+                    self.latency.mark("first_token")
+                print(text, end="", flush=True)
+                full_response.append(text)
+                if on_text:
+                    on_text(text)
             
             print()  # New line after streaming
-            return "".join(full_response)
+            reply = "".join(full_response)
+            self._cache_reply(user_input, reply)
         
         except Exception as e:
             print(f"❌ Streaming error: {e}")
-            # Fallback to non-streaming
-            response = self.chat.send_message(user_input)
-            return response.text
+            if full_response:
+                # Part of the reply was already streamed (and possibly spoken)
+                reply = "".join(full_response)
+            else:
+                # Fallback to non-streaming
+                reply = self.llm.generate(contents)
+                self.last_turn["ttft"] = time.perf_counter() - started
+                self.latency.mark("first_token")
+                self._cache_reply(user_input, reply)
+                if on_text:
+                    on_text(reply)
+        
+        self.last_turn["llm_total"] = time.perf_counter() - started
+        self._remember(user_input, reply)
+        return reply
+    
+    def _cached_reply(self, user_input):
+        """Reply from the response cache, recorded as a normal turn, or None"""
+        if not self.response_cache:
+            return None
+        # Follow-ups like "why?" are keyed on the last exchange too
+        reply = self.response_cache.get(self.personality["name"], user_input, self.history.last_exchange())
+        if reply is None:
+            return None
+        self.last_turn = {"ttft": 0.0, "llm_total": 0.0, "cached": True}
+        self.latency.mark("first_token")
+        print(f"Assistant (cached): {reply}")
+        print(f"⚡ {self.response_cache.format_stats()}")
+        self._remember(user_input, reply)
+        return reply
+    
+    def _cache_reply(self, user_input, reply):
+        if self.response_cache:
+            self.response_cache.put(self.personality["name"], user_input, reply, self.history.last_exchange())
+    
+    def _remember(self, user_input, reply):
+        """Add a finished turn to the bounded history and show the context size"""
+        self.history.add(user_input, reply)
+        print(f"🧠 Context: {self.history.describe()}")
+    
+    def think_and_speak(self, user_input):
+        """Stream Gemini's reply into TTS sentence by sentence.
+
+        Playback starts as soon as the first sentence is synthesized instead of
+        after the whole reply has been generated. Returns the full reply.
+        """
+        self.latency.mark("llm_request")
+        self.player.begin()
+        pipeline = SpeechPipeline(self._synthesize, self.player.write)
+        print("🤔 Thinking...")
+        try:
+            # Cached replies skip the network and go straight into TTS
+            reply = self._cached_reply(user_input)
+            if reply is not None:
+                pipeline.feed(reply)
+            else:
+                reply = self._think_streaming(user_input, on_text=pipeline.feed)
+        except Exception as e:
+            print(f"❌ LLM error: {e}")
+            reply = "Sorry, I encountered an error processing your request."
+            pipeline.say(reply)
+        llm_done = time.perf_counter()
+        pipeline.close()
+        pipeline.wait()
+        self.player.end()
+        self.player.wait()
+        # How long speech synthesis ran while the reply was still being generated
+        overlap = None
+        if pipeline.first_synthesis is not None:
+            overlap = max(0.0, llm_done - (pipeline.started + pipeline.first_synthesis))
+        self.last_turn.update({
+            "first_audio": self.player.last_latency,
+            "total": time.perf_counter() - pipeline.started,
+            "tts_overlap": overlap,
+            "segments": pipeline.segments,
+        })
+        if self.player.last_latency is not None:
+            print(f"🔊 {self.tts_type}: first audio after {self.player.last_latency:.2f}s "
+                  f"({pipeline.segments} segment(s), {self.player.underruns} underrun(s) total)")
+        return reply
+    
+    def think_then_speak(self, user_input):
+        """Generate the whole reply, then speak it (the non-pipelined turn). Returns the reply."""
+        started = time.perf_counter()
+        reply = self.think(user_input)
+        self.speak(reply)
+        first_audio = self.player.first_audio_at
+        self.last_turn.update({
+            "first_audio": first_audio - started if first_audio is not None and first_audio >= started else None,
+            "total": time.perf_counter() - started,
+        })
+        return reply
     
     def speak(self, text, blocking=True):
         """Convert text to speech and play it"""
         # remove emojis before speaking
         safe_text = self._strip_emojis(text)
 
+        # Canned responses are pre-rendered: hand them straight to the player
+        cached = self.phrase_cache.get(safe_text) if self.phrase_cache else None
+        if cached is not None:
+            self.player.play(cached, blocking=blocking)
+            return
+
         def _speak_thread():
             try:
                 print(f"🔊 Speaking with {self.tts_type}...")
@@ -684,30 +1074,80 @@ class VoiceAssistant:
         if blocking:
             thread.join()
     
-    def _speak_kokoro(self, text):
-        """Generate speech using Kokoro TTS"""
+    def _synthesize(self, text, use_cache=True):
+        """Yield float32 audio chunks for text with the active TTS engine"""
+        text = self._strip_emojis(text)
+        if self.tts_type == "Kokoro":
+            chunks = self._synthesize_kokoro(text)
+        elif self.tts_type == "KittenTTS":
+            chunks = self._kitten_chunks(text)
+        else:
+            print("❌ No TTS engine available")
+            return
+        if use_cache:
+            chunks = self._cached_synthesis(text, chunks)
+        yield from chunks
+    
+    def _cached_synthesis(self, text, chunks):
+        """Serve text from the TTS cache, or pass through chunks and store the result.
+
+        chunks is a lazy generator, so on a hit the model never runs.
+        """
+        if not self.tts_cache:
+            yield from chunks
+            return
+        voice = self.voice_name if self.tts_type == "Kokoro" else self.kitten_voice
+        speed = self.personality["voice"].get("speed", "normal")
+        key = self.tts_cache.key(self.tts_type, voice, speed, text)
+        audio = self.tts_cache.get(key)
+        if audio is not None:
+            chunks.close()
+            yield audio
+            return
+        rendered = []
+        for chunk in chunks:
+            rendered.append(chunk)
+            yield chunk
+        if rendered:
+            try:
+                self.tts_cache.put(key, np.concatenate(rendered))
+            except OSError as e:
+                print(f"⚠️  Could not write TTS cache: {e}")
+    
+    def _synthesize_kokoro(self, text):
+        """Generate speech chunks using Kokoro TTS"""
         speed = self.personality["voice"].get("speed", "normal")
         speed_map = {"slow": 0.8, "normal": 1.0, "fast": 1.2}
         speed_value = speed_map.get(speed, 1.0)
         
-        generator = self.tts_engine(text, voice=self.voice_name, speed=speed_value)
-        
-        for i, (graphemes, phonemes, audio_chunk) in enumerate(generator):
-            if not isinstance(audio_chunk, np.ndarray):
-                audio_chunk = np.array(audio_chunk, dtype=np.float32)
+        with self.tts_lock:
+            generator = self.tts_engine(text, voice=self.voice_name, speed=speed_value)
             
-            # Use selected speaker if configured
-            if SPEAKER_INDEX is not None:
-                sd.play(audio_chunk, self.sample_rate, device=SPEAKER_INDEX)
-            else:
-                sd.play(audio_chunk, self.sample_rate)
-            sd.wait()
+            for graphemes, phonemes, audio_chunk in generator:
+                if not isinstance(audio_chunk, np.ndarray):
+                    audio_chunk = np.array(audio_chunk, dtype=np.float32)
+                yield audio_chunk
     
-    def _speak_kitten(self, text):
+    def _speak_kokoro(self, text):
+        """Generate speech using Kokoro TTS
+
+        Chunks are queued on the persistent player as they are generated, so
+        chunk N+1 is synthesized while chunk N plays.
+        """
+        self.player.begin()
+        try:
+            for audio_chunk in self._cached_synthesis(text, self._synthesize_kokoro(text)):
+                self.player.write(audio_chunk)
+        finally:
+            self.player.end()
+        self.player.wait()
+    
+    def _synthesize_kitten(self, text):
         """Generate speech using KittenTTS"""
         speed = self.personality["voice"].get("speed", "normal")
         
-        audio = self.tts_engine.generate(text, voice=self.kitten_voice)
+        with self.tts_lock:
+            audio = self.tts_engine.generate(text, voice=self.kitten_voice)
         
         if not isinstance(audio, np.ndarray):
             audio = np.array(audio, dtype=np.float32)
@@ -716,13 +1156,21 @@ class VoiceAssistant:
             audio = self._change_speed(audio, 0.85)
         elif speed == "fast":
             audio = self._change_speed(audio, 1.15)
-        
-        # Use selected speaker if configured
-        if SPEAKER_INDEX is not None:
-            sd.play(audio, self.sample_rate, device=SPEAKER_INDEX)
-        else:
-            sd.play(audio, self.sample_rate)
-        sd.wait()
+        return audio
+    
+    def _kitten_chunks(self, text):
+        """KittenTTS output as a lazy one-chunk generator"""
+        yield self._synthesize_kitten(text)
+    
+    def _speak_kitten(self, text):
+        """Generate speech using KittenTTS"""
+        self.player.begin()
+        try:
+            for audio in self._cached_synthesis(text, self._kitten_chunks(text)):
+                self.player.write(audio)
+        finally:
+            self.player.end()
+        self.player.wait()
     
     def _change_speed(self, audio, speed_factor):
         """Change audio speed by resampling"""
@@ -734,25 +1182,64 @@ class VoiceAssistant:
         """Check if the wake word is in the text"""
         return self.wake_word in text.lower()
     
+    def _command_after_wake_word(self, text):
+        """Return whatever was said after the wake word ("hey spark what time is it")"""
+        lower = text.lower()
+        index = lower.find(self.wake_word)
+        if index < 0:
+            return ""
+        return text[index + len(self.wake_word):].strip(" ,.!?")
+    
     def listen_for_wake_word_porcupine(self):
         """Listen for wake word using Porcupine (frame-by-frame processing)"""
         try:
-            if not self.porcupine_recorder.is_recording:
-                self.porcupine_recorder.start()
-            
-            # Read audio frame
-            pcm = self.porcupine_recorder.read()
+            # Read audio frame from the shared capture buffer
+            pcm = self.wake_reader.read(self.wake_engine.frame_length, timeout=1.0)
+            if pcm is None:
+                return False
             
             # Process with Porcupine
-            keyword_index = self.wake_engine.process(pcm)
+            keyword_index = self.wake_engine.process(pcm.tolist())
             
-            # Return True if wake word detected
-            return keyword_index >= 0
+            # Return True if wake word detected, remembering where the
+            # keyword ended so command capture can start right there
+            if keyword_index >= 0:
+                self.command_start = self.wake_reader.position
+                return True
+            return False
             
         except Exception as e:
             print(f"⚠️  Porcupine error: {e}")
             return False
     
+    def _speak_acknowledgment(self, text):
+        """Acknowledge the wake word in the background, unless a command follows it at once.
+
+        Command capture runs meanwhile; audio recorded while the
+        acknowledgment plays is muted, audio from before it is kept.
+        """
+        self.speech_started.clear()
+        
+        def _ack_thread():
+            if self.speech_started.wait(WAKE_ACK_DELAY_S):
+                return  # Already talking: the command is being captured
+            print(f"✨ {self.personality['name']}: {text}")
+            self.playback_mute.begin()
+            try:
+                self.speak(text)
+            finally:
+                self.playback_mute.end()
+        
+        threading.Thread(target=_ack_thread, daemon=True).start()
+    
+    def _finish_turn_timing(self, reply_started):
+        """Mark when the reply became audible and ended, and record the turn's latencies"""
+        first_audio = self.player.first_audio_at
+        if first_audio is not None and first_audio >= reply_started:
+            self.latency.mark("first_audio", at=first_audio)
+        self.latency.mark("playback_end")
+        self.latency.finish_turn()
+    
     def run(self):
         """Main loop for the voice assistant"""
         print("\n" + "="*60)
@@ -773,51 +1260,45 @@ class VoiceAssistant:
         
         try:
             while True:
+                self._handle_events()
+                
                 # If sleeping, listen for wake word
                 if not self.is_awake:
                     # Use Porcupine if available
-                    if self.wake_type.startswith("Porcupine") and self.porcupine_recorder:
+                    if self.wake_type.startswith("Porcupine") and self.wake_reader:
                         print(f"\r💤 Sleeping... Say '{self.wake_word}' to wake me up", end="", flush=True)
                         
                         if self.listen_for_wake_word_porcupine():
+                            self.latency.mark("wake")
                             print("\r" + " " * 70 + "\r", end="", flush=True)  # Clear line
                             self.is_awake = True
-                            wake_response = self.get_random_response("wake_acknowledgment")
-                            print(f"✨ {self.personality['name']}: {wake_response}")
-
-                            # Speak the acknowledgement non-blocking so we can start
-                            # preparing the recognizer immediately; then recalibrate
-                            # for ambient noise so short commands (e.g. "what is the time")
-                            # are more likely to be captured.
-                            self.speak(wake_response, blocking=False)
-
-                            # Give TTS a brief moment to start playing, then recalibrate
-                            # the recognizer so ambient noise and playback are accounted for.
-                            time.sleep(0.15)
-                            try:
-                                with self.microphone as source:
-                                    # Short adjustment to be ready for user command
-                                    self.recognizer.adjust_for_ambient_noise(source, duration=0.4)
-                            except Exception:
-                                # If recalibration fails, continue anyway
-                                pass
+                            # Go straight to command capture from the end of the
+                            # wake keyword; the acknowledgment is only spoken if
+                            # the user doesn't carry on talking ("hey spark what
+                            # time is it" in one breath).
+                            self._speak_acknowledgment(self.get_random_response("wake_acknowledgment"))
                     else:
                         # Fallback to STT-based detection
                         user_input = self.listen(listening_for_wake=True)
                         
                         if user_input and self.check_for_wake_word(user_input):
+                            self.latency.mark("wake")
                             self.is_awake = True
+                            # A command spoken right after the wake word is used as-is
+                            self.pending_command = self._command_after_wake_word(user_input) or None
+                            if self.pending_command:
+                                continue
                             wake_response = self.get_random_response("wake_acknowledgment")
                             print(f"✨ {self.personality['name']}: {wake_response}")
                             self.speak(wake_response)
-                            
-                            # Reset energy threshold after wake word
-                            with self.microphone as source:
-                                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
                     continue
                 
                 # If awake, listen for commands
-                user_input = self.listen()
+                if self.pending_command:
+                    user_input, self.pending_command = self.pending_command, None
+                else:
+                    start, self.command_start = self.command_start, None
+                    user_input = self.listen(start_position=start)
                 
                 if user_input is None:
                     continue
@@ -825,9 +1306,11 @@ class VoiceAssistant:
                 # Check for sleep command
                 if "sleep" in user_input.lower() and len(user_input.split()) <= 3:
                     self.is_awake = False
-                    sleep_msg = "Going to sleep mode. Wake me when you need me!"
-                    print(f"💤 {self.personality['name']}: {sleep_msg}")
-                    self.speak(sleep_msg)
+                    if self.wake_reader:
+                        # Don't run the wake word over audio from while we were awake
+                        self.wake_reader.seek_live()
+                    print(f"💤 {self.personality['name']}: {SLEEP_MESSAGE}")
+                    self.speak(SLEEP_MESSAGE)
                     continue
                 
                 # Check for exit commands
@@ -840,27 +1323,54 @@ class VoiceAssistant:
                 # Try plugins first
                 response = None
                 if self.plugin_manager:
-                    response = self.plugin_manager.process_input(user_input, {"personality": self.personality})
+                    self.latency.mark("plugin_start")
+                    response = self.plugin_manager.process_input(user_input, {
+                        "personality": self.personality,
+                        "audio_stream": self.mic_stream,
+                        "models": models.registry,
+                        "stt": self.stt_backend,
+                        "player": self.player,
+                        "scheduler": self.scheduler,
+                        "weather": self.weather
+                    }, on_wait=lambda: self.speak(PLUGIN_FILLER, blocking=False))
+                    self.latency.mark("plugin_end")
                 
-                # If no plugin handled it, use Gemini
+                # If no plugin handled it, use Gemini. When streaming, the reply
+                # is spoken sentence by sentence while it is being generated.
+                reply_started = time.perf_counter()
                 if not response:
-                    response = self.think(user_input)
+                    if ENABLE_STREAMING and self.tts_engine:
+                        self.think_and_speak(user_input)
+                        self._finish_turn_timing(reply_started)
+                        continue
+                    self.think_then_speak(user_input)
+                    self._finish_turn_timing(reply_started)
+                    continue
                 
                 # Speak the response
                 self.speak(response)
+                self._finish_turn_timing(reply_started)
         
         finally:
-            # Cleanup Porcupine resources
-            if self.porcupine_recorder and self.porcupine_recorder.is_recording:
-                self.porcupine_recorder.stop()
-            if self.porcupine_recorder:
-                self.porcupine_recorder.delete()
+            # Cleanup capture, playback and Porcupine resources
+            self.mic_stream.stop()
+            self.player.close()
+            if self.plugin_manager:
+                self.plugin_manager.close()
+            if self.scheduler:
+                self.scheduler.stop()
+            if self.weather:
+                self.weather.close()
+            self.utterance_log.close()
+            if self.response_cache:
+                self.response_cache.close()
+            self.latency.dump(LATENCY_REPORT_PATH)
             if self.wake_engine:
                 self.wake_engine.delete()
 
 def main():
     # Check if API key is set
-    if not GEMINI_API_KEY:
+    if LLM_BACKEND == "gemini" and not GEMINI_API_KEY:
         print("❌ Error: GEMINI_API_KEY not found!")
         print("Please create a .env file with your API key:")
         print("GEMINI_API_KEY=your_api_key_here")
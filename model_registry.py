@@ -0,0 +1,204 @@
+"""
+Process-wide model registry
+
+Heavy models (Whisper, faster-whisper, Kokoro, KittenTTS) are loaded at most once per
+process and handed out as reference-counted handles keyed by
+(kind, name, device, dtype). The assistant, plugins and tools all go through
+the same registry, which also reports how much memory each resident model holds.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ModelKey = Tuple[str, str, str, str]
+
+
+class ModelHandle:
+    """Reference to a shared model; call release() (or use as a context manager) when done"""
+
+    def __init__(self, registry: "ModelRegistry", key: ModelKey, model: Any):
+        self.registry = registry
+        self.key = key
+        self.model = model
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.registry._release(self.key)
+
+    def __enter__(self):
+        return self.model
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class _Entry:
+    def __init__(self):
+        self.model = None
+        self.refs = 0
+        self.load_seconds = 0.0
+        self.bytes = None
+        self.lock = threading.Lock()  # Held while loading so a model is never loaded twice
+
+
+class ModelRegistry:
+    """Loads each (kind, name, device, dtype) model once and shares it"""
+
+    def __init__(self):
+        self._entries: Dict[ModelKey, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, kind: str, name: str, device: str = "cpu", dtype: str = "float32",
+                loader: Optional[Callable[[], Any]] = None) -> ModelHandle:
+        """Get a handle to a model, loading it with `loader` if it isn't resident yet"""
+        key = (kind, name, str(device), dtype)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+
+        with entry.lock:
+            if entry.model is None:
+                if loader is None:
+                    raise KeyError(f"Model {key} is not loaded and no loader was given")
+                started = time.perf_counter()
+                entry.model = loader()
+                entry.load_seconds = time.perf_counter() - started
+                entry.bytes = estimate_model_bytes(entry.model)
+            entry.refs += 1
+            return ModelHandle(self, key, entry.model)
+
+    def find(self, kind: str, name: Optional[str] = None) -> Optional[ModelHandle]:
+        """Get a handle to any resident model of `kind` (and `name`), without loading"""
+        with self._lock:
+            keys = [k for k, e in self._entries.items()
+                    if k[0] == kind and (name is None or k[1] == name) and e.model is not None]
+        for key in keys:
+            try:
+                return self.acquire(*key)
+            except KeyError:
+                continue
+        return None
+
+    def _release(self, key: ModelKey):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            with entry.lock:
+                entry.refs = max(0, entry.refs - 1)
+
+    def unload_unused(self) -> int:
+        """Drop resident models nobody holds a handle to; returns how many were unloaded"""
+        unloaded = 0
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, entry in entries:
+            with entry.lock:
+                if entry.model is not None and entry.refs == 0:
+                    entry.model = None
+                    entry.bytes = None
+                    unloaded += 1
+        if unloaded:
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except Exception:
+                pass
+        return unloaded
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """Resident models with reference counts, load time and estimated memory"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return [
+            {
+                "kind": key[0],
+                "name": key[1],
+                "device": key[2],
+                "dtype": key[3],
+                "refs": entry.refs,
+                "load_seconds": entry.load_seconds,
+                "bytes": entry.bytes,
+            }
+            for key, entry in entries
+            if entry.model is not None
+        ]
+
+    def format_report(self) -> str:
+        """Human-readable memory_report()"""
+        rows = self.memory_report()
+        if not rows:
+            return "No models loaded."
+        lines = []
+        for row in rows:
+            size = f"{row['bytes'] / (1024 * 1024):.1f} MB" if row["bytes"] else "unknown size"
+            lines.append(
+                f"{row['kind']} {row['name']} [{row['device']}, {row['dtype']}]: "
+                f"{size}, {row['refs']} ref(s), loaded in {row['load_seconds']:.1f}s"
+            )
+        return "\n".join(lines)
+
+
+def estimate_model_bytes(model: Any, _depth: int = 0) -> Optional[int]:
+    """Parameter + buffer bytes of a torch module, looking one level into wrappers"""
+    try:
+        import torch
+    except ImportError:
+        return None
+
+    if isinstance(model, torch.nn.Module):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    # Wrappers such as Kokoro's KPipeline keep the module in an attribute
+    if _depth < 2:
+        for attr in ("model", "models"):
+            inner = getattr(model, attr, None)
+            if isinstance(inner, dict):
+                sizes = [estimate_model_bytes(m, _depth + 1) for m in inner.values()]
+                sizes = [s for s in sizes if s]
+                if sizes:
+                    return sum(sizes)
+            elif inner is not None:
+                size = estimate_model_bytes(inner, _depth + 1)
+                if size:
+                    return size
+    return None
+
+
+# The process-wide registry
+registry = ModelRegistry()
+
+
+def acquire_whisper(name: str, device: str) -> ModelHandle:
+    """Shared openai-whisper model (weights stay fp32; fp16 is a decode-time option)"""
+    def load():
+        import whisper
+        return whisper.load_model(name, device=device)
+    return registry.acquire("whisper", name, device, "float32", load)
+
+
+def acquire_faster_whisper(name: str, device: str, compute_type: str, cpu_threads: int = 0) -> ModelHandle:
+    """Shared faster-whisper (CTranslate2) model; keyed by compute type"""
+    def load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+    return registry.acquire("faster-whisper", name, device, compute_type, load)
+
+
+def acquire_kokoro(lang_code: str, device: str) -> ModelHandle:
+    """Shared Kokoro KPipeline for a language"""
+    def load():
+        from kokoro import KPipeline
+        return KPipeline(lang_code=lang_code)
+    return registry.acquire("kokoro", lang_code, device, "float32", load)
+
+
+def acquire_kitten(name: str, device: str) -> ModelHandle:
+    """Shared KittenTTS model"""
+    def load():
+        from kittentts import KittenTTS
+        return KittenTTS(name, device=device)
+    return registry.acquire("kittentts", name, device, "float32", load)
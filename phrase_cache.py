@@ -0,0 +1,136 @@
+"""
+Pre-rendered personality phrases
+
+The canned lines a personality speaks (wake acknowledgments, farewells,
+errors, timeouts, the sleep message) never change between runs, so they are
+synthesized once per (personality, engine, voice, speed) and stored as
+float32 .npy files. At runtime they are memory-mapped and handed straight to
+the audio player, skipping the TTS model entirely.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def _digest(value: str, length: int = 16) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:length]
+
+
+class PhraseCache:
+    """On-disk cache of synthesized phrases for one voice configuration.
+
+    Args:
+        cache_dir: Root directory; each configuration gets its own subdirectory
+        synthesize: Function taking text and returning float32 audio
+        config: What the audio depends on (personality, engine, voice, speed, ...)
+    """
+
+    def __init__(self, cache_dir: str, synthesize: Callable[[str], np.ndarray], config: Dict[str, object]):
+        self.synthesize = synthesize
+        self.config = dict(config)
+        self.directory = os.path.join(cache_dir, _digest(json.dumps(self.config, sort_keys=True)))
+        self._phrases: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._build_thread = None
+        self._watch_stop = threading.Event()
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Pre-rendered audio for text, or None if it isn't cached (yet)"""
+        return self._phrases.get(text)
+
+    def _path(self, text: str) -> str:
+        return os.path.join(self.directory, f"{_digest(text, 40)}.npy")
+
+    def build(self, phrases: Iterable[str]):
+        """Load cached phrases and synthesize the missing ones (blocking).
+
+        Phrases no longer in the list are dropped from memory and disk.
+        """
+        phrases = list(dict.fromkeys(p for p in phrases if p and p.strip()))
+        os.makedirs(self.directory, exist_ok=True)
+        wanted = {self._path(p) for p in phrases}
+
+        loaded = {}
+        for text in phrases:
+            path = self._path(text)
+            if not os.path.exists(path):
+                try:
+                    audio = np.ascontiguousarray(self.synthesize(text), dtype=np.float32)
+                except Exception as e:
+                    print(f"⚠️  Could not pre-render phrase '{text}': {e}")
+                    continue
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, audio)
+                os.replace(tmp, path)
+            loaded[text] = np.load(path, mmap_mode="r")
+            # Make each phrase available as soon as it's ready
+            with self._lock:
+                self._phrases[text] = loaded[text]
+
+        with self._lock:
+            self._phrases = loaded
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".npy") and path not in wanted:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def build_async(self, phrases: Iterable[str]) -> threading.Thread:
+        """Run build() on a background thread (waits for a build already running)"""
+        phrases = list(phrases)
+
+        def run():
+            try:
+                self.build(phrases)
+            except Exception as e:
+                print(f"⚠️  Phrase cache build failed: {e}")
+
+        previous = self._build_thread
+
+        def chained():
+            if previous is not None:
+                previous.join()
+            run()
+
+        self._build_thread = threading.Thread(target=chained, daemon=True, name="phrase-cache")
+        self._build_thread.start()
+        return self._build_thread
+
+    def watch(self, path: str, load_phrases: Callable[[], List[str]], interval: float = 2.0):
+        """Rebuild in the background whenever the file at path changes"""
+        def loop():
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                mtime = None
+            while not self._watch_stop.wait(interval):
+                try:
+                    current = os.path.getmtime(path)
+                except OSError:
+                    continue
+                if current == mtime:
+                    continue
+                mtime = current
+                try:
+                    phrases = load_phrases()
+                except Exception as e:
+                    print(f"⚠️  Could not reload {path}: {e}")
+                    continue
+                print(f"\n🔁 {os.path.basename(path)} changed, re-rendering phrases...")
+                self.build_async(phrases)
+
+        threading.Thread(target=loop, daemon=True, name="phrase-cache-watch").start()
+
+    def stop(self):
+        self._watch_stop.set()
@@ -3,21 +3,59 @@ Plugin System for Voice Assistant
 
 Plugins can extend the assistant's functionality with custom actions.
 Each plugin should inherit from Plugin base class and implement execute().
+
+A plugin module declares its plugins in a manifest -- a module-level PLUGINS
+list, or a JSON sidecar next to the module (my_plugin.json) -- of entries like
+{"class": "MyPlugin", "description": "...", "triggers": [...]}. Manifests are
+read without importing the module; the module is imported only when one of
+its triggers first matches. Modules without a manifest are imported at startup.
+
+Plugins run on a small worker pool with a deadline each (an optional
+"timeout" in the manifest, in seconds). A plugin that misses its deadline is
+abandoned and the assistant falls back to the LLM; the context's "cancelled"
+event is set so long-running plugins can stop early. "filler": false in the
+manifest turns off the spoken filler for plugins that use the microphone or
+speakers themselves.
 """
 
+import ast
 import importlib
+import json
 import os
+import sys
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from time import perf_counter  # Not "import time": the plugins.time submodule would shadow it
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 
 
 class Plugin(ABC):
     """Base class for all plugins"""
     
+    # Bumped whenever any plugin's triggers are assigned, so the manager knows
+    # to rebuild its trigger index
+    _triggers_version = 0
+    
     def __init__(self):
-        self.name = self.__class__.__name__
-        self.description = ""
-        self.triggers = []  # Keywords that activate this plugin
+        manifest = _manifest_entry(type(self))
+        self.name = manifest.get("name", self.__class__.__name__)
+        self.description = manifest.get("description", "")
+        self.triggers = manifest.get("triggers", [])  # Keywords that activate this plugin
+        self.timeout = manifest.get("timeout")  # Seconds; None = the manager's default
+        self.filler = manifest.get("filler", True)  # Speak a filler while this plugin is slow
+    
+    @property
+    def triggers(self) -> List[str]:
+        return self._triggers
+    
+    @triggers.setter
+    def triggers(self, value: Iterable[str]):
+        # Assign a new list to change triggers; in-place edits aren't noticed
+        self._triggers = list(value)
+        self._trigger_index = None  # Built on the first should_handle()
+        Plugin._triggers_version += 1
     
     @abstractmethod
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
@@ -34,17 +72,181 @@ class Plugin(ABC):
         pass
     
     def should_handle(self, user_input: str) -> bool:
-        """Check if this plugin should handle the input"""
-        user_lower = user_input.lower()
-        return any(trigger in user_lower for trigger in self.triggers)
+        """Check if this plugin should handle the input (whole-word matching, as PluginManager.match)"""
+        if self._trigger_index is None:
+            self._trigger_index = TriggerIndex((trigger, None) for trigger in self.triggers)
+        return bool(self._trigger_index.search(normalize_text(user_input)))
+
+
+def _manifest_entry(cls) -> Dict[str, Any]:
+    """The entry for cls in its module's PLUGINS manifest, if any"""
+    module = sys.modules.get(cls.__module__)
+    for entry in getattr(module, "PLUGINS", ()):
+        if entry.get("class") == cls.__name__:
+            return entry
+    return {}
+
+
+def read_manifest(path: str) -> Optional[List[Dict[str, Any]]]:
+    """Manifest entries for a plugin module, without importing it.
+
+    Looks for a JSON sidecar first, then a literal PLUGINS assignment in the
+    source. Returns None when the module has no manifest.
+    """
+    sidecar = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(sidecar):
+        with open(sidecar, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        entries = None
+        for node in tree.body:
+            if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                    and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "PLUGINS"):
+                entries = ast.literal_eval(node.value)
+        if entries is None:
+            return None
+    if isinstance(entries, dict):
+        entries = [entries]
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("class"):
+            raise ValueError(f"manifest entries need a \"class\": {entry!r}")
+    return entries
+
+
+class LazyPlugin(Plugin):
+    """Stands in for a manifest-declared plugin until its triggers first match"""
+    
+    def __init__(self, module_name: str, manifest: Dict[str, Any]):
+        super().__init__()
+        self.module_name = module_name
+        self.class_name = manifest["class"]
+        self.name = manifest.get("name", self.class_name)
+        self.description = manifest.get("description", "")
+        self.triggers = manifest.get("triggers", [])
+        self.timeout = manifest.get("timeout")
+        self.filler = manifest.get("filler", True)
+        self._plugin: Optional[Plugin] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def loaded(self) -> bool:
+        return self._plugin is not None
+    
+    def load(self) -> Plugin:
+        """Import the module and instantiate the real plugin (once)"""
+        with self._lock:
+            if self._plugin is None:
+                started = perf_counter()
+                module = importlib.import_module(self.module_name)
+                plugin = getattr(module, self.class_name)()
+                # A sidecar manifest isn't visible to the plugin itself
+                if plugin.name == self.class_name:
+                    plugin.name = self.name
+                plugin.description = plugin.description or self.description
+                if not plugin.triggers:
+                    plugin.triggers = self.triggers
+                elif plugin.triggers != self.triggers:
+                    self.triggers = plugin.triggers
+                self._plugin = plugin
+                print(f"🔌 Loaded plugin {self.name} on first use "
+                      f"({(perf_counter() - started) * 1000:.0f} ms)")
+            return self._plugin
+    
+    def execute(self, user_input: str, context: Dict[str, Any]) -> str:
+        return self.load().execute(user_input, context)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace (triggers and input are matched in this form)"""
+    return " ".join(text.lower().split())
+
+
+class TriggerIndex:
+    """Aho-Corasick automaton over many trigger phrases.
+
+    One pass over the input finds every trigger occurrence, however many
+    triggers there are. Matches must start and end on word boundaries, so
+    "time" matches "what time is it" but not "sometimes" or "timer".
+    """
+    
+    def __init__(self, patterns: Iterable[Tuple[str, Any]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]  # (pattern length, payload)
+        for pattern, payload in patterns:
+            self._add(normalize_text(pattern), payload)
+        self._link()
+    
+    def _add(self, pattern: str, payload: Any):
+        if not pattern:
+            return
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), payload))
+    
+    def _link(self):
+        # Breadth-first failure links; each node also inherits its fail node's outputs
+        queue = deque(self._goto[0].values())  # Depth-1 nodes fail to the root
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+    
+    def search(self, text: str) -> List[Tuple[int, int, Any]]:
+        """All word-bounded matches in already-normalized text as (start, end, payload)"""
+        matches = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            for length, payload in out[node]:
+                start = end - length
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    matches.append((start, end, payload))
+        return matches
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
 
 
 class PluginManager:
     """Manages loading and executing plugins"""
     
-    def __init__(self, plugins_dir: str = "plugins"):
+    def __init__(self, plugins_dir: str = "plugins", max_workers: int = 4,
+                 timeout: float = 3.0, filler_delay: float = 0.8):
         self.plugins_dir = plugins_dir
         self.plugins: List[Plugin] = []
+        self.timeout = timeout
+        self.filler_delay = filler_delay
+        self._index = None
+        self._index_version = None
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plugin")
+        self._running: Dict[str, Future] = {}  # plugin name -> its latest call
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
         self._load_plugins()
     
     def _load_plugins(self):
@@ -57,10 +259,24 @@ class PluginManager:
         plugin_files = [f[:-3] for f in os.listdir(self.plugins_dir) 
                        if f.endswith('.py') and not f.startswith('_')]
         
-        for plugin_name in plugin_files:
+        for plugin_name in sorted(plugin_files):
+            module_name = f"{self.plugins_dir}.{plugin_name}"
             try:
-                # Import the plugin module
-                module = importlib.import_module(f"{self.plugins_dir}.{plugin_name}")
+                manifest = read_manifest(os.path.join(self.plugins_dir, f"{plugin_name}.py"))
+            except Exception as e:
+                print(f"⚠ Invalid manifest for plugin {plugin_name}: {e}")
+                continue
+            
+            if manifest is not None:
+                for entry in manifest:
+                    plugin = LazyPlugin(module_name, entry)
+                    self.plugins.append(plugin)
+                    print(f"✓ Registered plugin: {plugin.name}")
+                continue
+            
+            try:
+                # No manifest: import the plugin module now
+                module = importlib.import_module(module_name)
                 
                 # Find Plugin classes in the module
                 for attr_name in dir(module):
@@ -75,24 +291,133 @@ class PluginManager:
             except Exception as e:
                 print(f"⚠ Failed to load plugin {plugin_name}: {e}")
     
-    def process_input(self, user_input: str, context: Dict[str, Any]) -> str:
+    def process_input(self, user_input: str, context: Dict[str, Any],
+                      on_wait: Optional[Callable[[], None]] = None) -> str:
         """
         Process user input through plugins
         
+        Args:
+            on_wait: Called once if a plugin hasn't answered after filler_delay
+                seconds (e.g. to say "one moment")
+        
         Returns:
-            Plugin response or None if no plugin handles the input
+            Plugin response or None if no plugin handles the input in time
         """
-        for plugin in self.plugins:
-            if plugin.should_handle(user_input):
-                try:
-                    response = plugin.execute(user_input, context)
-                    if response:
-                        return response
-                except Exception as e:
-                    print(f"⚠ Plugin {plugin.name} error: {e}")
+        # Only one filler per request, however many plugins are tried
+        fillers = [on_wait] if on_wait else []
+        
+        def wait_once():
+            if fillers:
+                fillers.pop()()
+        
+        for plugin in self.match(user_input):
+            response = self._run(plugin, user_input, context, wait_once if on_wait else None)
+            if response:
+                return response
         
         return None
     
+    def _run(self, plugin: Plugin, user_input: str, context: Dict[str, Any],
+             on_wait: Optional[Callable[[], None]]) -> Optional[str]:
+        """Run one plugin on the pool and wait up to its deadline"""
+        previous = self._running.get(plugin.name)
+        if previous is not None and not previous.done():
+            # Still stuck on an earlier request; don't pile more work onto it
+            self._count(plugin.name, "skipped")
+            print(f"⏳ Plugin {plugin.name} is still busy, skipping")
+            return None
+        
+        cancelled = threading.Event()
+        context = dict(context, cancelled=cancelled)
+        deadline = plugin.timeout or self.timeout
+        started = perf_counter()
+        future = self._pool.submit(plugin.execute, user_input, context)
+        future.add_done_callback(lambda f: self._finished(plugin.name, f, perf_counter() - started))
+        self._running[plugin.name] = future
+        self._count(plugin.name, "calls")
+        
+        try:
+            if on_wait is not None and plugin.filler and self.filler_delay < deadline:
+                try:
+                    return future.result(timeout=self.filler_delay)
+                except FutureTimeout:
+                    on_wait()
+            return future.result(timeout=max(0.0, deadline - (perf_counter() - started)))
+        except FutureTimeout:
+            future.cancel()
+            cancelled.set()
+            self._count(plugin.name, "timeouts")
+            print(f"⏱️  Plugin {plugin.name} timed out after {deadline:.1f}s, moving on")
+        except Exception as e:
+            print(f"⚠ Plugin {plugin.name} error: {e}")
+        return None
+    
+    def _stats_for(self, name: str) -> Dict[str, float]:
+        return self._stats.setdefault(name, {"calls": 0, "timeouts": 0, "errors": 0, "skipped": 0,
+                                             "completed": 0, "total_s": 0.0, "max_s": 0.0})
+    
+    def _count(self, name: str, counter: str):
+        with self._stats_lock:
+            self._stats_for(name)[counter] += 1
+    
+    def _finished(self, name: str, future: Future, elapsed: float):
+        # Runs when the call really ends, so late finishers still report their latency
+        if future.cancelled():
+            return
+        with self._stats_lock:
+            stats = self._stats_for(name)
+            if future.exception() is not None:
+                stats["errors"] += 1
+            stats["completed"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-plugin call, timeout and latency counters"""
+        with self._stats_lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+    
+    def format_stats(self) -> str:
+        stats = self.stats()
+        if not stats:
+            return "Plugins: no calls yet"
+        lines = ["Plugins:"]
+        for name, s in sorted(stats.items()):
+            mean = f"{s['total_s'] / s['completed'] * 1000:.0f} ms" if s["completed"] else "-"
+            lines.append(f"   {name}: {s['calls']} calls, avg {mean}, max {s['max_s'] * 1000:.0f} ms, "
+                         f"{s['timeouts']} timeouts, {s['errors']} errors, {s['skipped']} skipped")
+        return "\n".join(lines)
+    
+    def close(self):
+        """Stop the worker pool without waiting for stuck plugins"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+    
+    def match(self, user_input: str) -> List[Plugin]:
+        """Plugins whose triggers occur in the input, best match first.
+        
+        A plugin's score is the total length of the distinct triggers it
+        matched, so longer, more specific phrases outrank short generic ones;
+        ties go to the plugin loaded first.
+        """
+        index = self._trigger_index()
+        matched: Dict[int, Dict[int, int]] = {}
+        for start, end, (slot, trigger_id) in index.search(normalize_text(user_input)):
+            matched.setdefault(slot, {})[trigger_id] = end - start
+        ranked = sorted(matched, key=lambda slot: (-sum(matched[slot].values()), slot))
+        return [self.plugins[slot] for slot in ranked]
+    
+    def _trigger_index(self) -> TriggerIndex:
+        """The trigger index, rebuilt if plugins or their triggers changed"""
+        version = (Plugin._triggers_version, len(self.plugins))
+        if self._index is None or self._index_version != version:
+            self._index = TriggerIndex(
+                (trigger, (slot, trigger_id))
+                for slot, plugin in enumerate(self.plugins)
+                for trigger_id, trigger in enumerate(plugin.triggers)
+            )
+            self._index_version = version
+        return self._index
+    
     def get_plugin_info(self) -> List[Dict[str, str]]:
         """Get information about loaded plugins"""
         return [
@@ -7,19 +7,24 @@ from typing import Dict, Any
 import speech_recognition as sr
 import numpy as np
 import sounddevice as sd
-import time
+import threading
 
-
-class AudioPlugin(Plugin):
-    def __init__(self):
-        super().__init__()
-        self.description = "Test and configure audio devices (microphone and speakers)"
-        self.triggers = [
+PLUGINS = [
+    {
+        "class": "AudioPlugin",
+        "description": "Test and configure audio devices (microphone and speakers)",
+        "triggers": [
             "microphone", "mic test", "test microphone", "list microphones",
             "speaker", "speakers", "test speakers", "list speakers", "test audio",
             "audio test", "sound test", "list audio"
-        ]
-    
+        ],
+        "timeout": 20,  # Interactive tests wait for the user
+        "filler": False,  # A spoken filler would be recorded or play over the test tones
+    },
+]
+
+
+class AudioPlugin(Plugin):
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
         """Handle audio configuration requests"""
         user_lower = user_input.lower()
@@ -28,19 +33,19 @@ class AudioPlugin(Plugin):
         if "list" in user_lower and ("mic" in user_lower or "microphone" in user_lower):
             return self._list_microphones()
         elif "test" in user_lower and ("mic" in user_lower or "microphone" in user_lower):
-            return self._test_current_microphone()
+            return self._test_current_microphone(context)
         
         # Speaker commands
         elif "list" in user_lower and ("speaker" in user_lower or "output" in user_lower):
             return self._list_speakers()
         elif "test" in user_lower and ("speaker" in user_lower or "output" in user_lower):
-            return self._test_speakers()
+            return self._test_speakers(context)
         
         # General audio commands
         elif "list" in user_lower and "audio" in user_lower:
             return self._list_all_devices()
         elif "test" in user_lower and "audio" in user_lower:
-            return self._test_audio_loop()
+            return self._test_audio_loop(context)
         
         else:
             return (
@@ -117,47 +122,85 @@ class AudioPlugin(Plugin):
         except Exception as e:
             return f"Error listing devices: {e}"
     
-    def _test_current_microphone(self) -> str:
+    def _record(self, context: Dict[str, Any], recognizer, timeout: float, phrase_time_limit: float):
+        """Record a phrase as a 16 kHz PcmBuffer, preferring the assistant's shared capture stream"""
+        from audio_capture import PcmBuffer, record_phrase
+        stream = context.get("audio_stream")
+        if stream is not None and stream.is_running:
+            utterance = record_phrase(stream.reader(), stream.sample_rate, recognizer.energy_threshold,
+                                      timeout=timeout, phrase_time_limit=phrase_time_limit)
+            if utterance is None:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            return utterance
+        
+        with sr.Microphone() as source:
+            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        pcm = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        utterance = PcmBuffer(len(pcm), sample_rate=16000)
+        utterance.append(pcm)
+        return utterance
+    
+    def _whisper_handle(self, context: Dict[str, Any]):
+        """Shared Whisper model from the model registry (loaded once per process)"""
+        registry = context.get("models")
+        if registry is not None:
+            handle = registry.find("whisper")
+            if handle is not None:
+                return handle
+        import model_registry
+        return model_registry.acquire_whisper("base", "cpu")
+    
+    def _test_current_microphone(self, context: Dict[str, Any]) -> str:
         """Test the current microphone"""
         try:
             recognizer = sr.Recognizer()
             recognizer.energy_threshold = 300
             recognizer.dynamic_energy_threshold = False
             
-            with sr.Microphone() as source:
-                print("\n🎤 Testing microphone - say something...")
-                audio = recognizer.listen(source, timeout=5, phrase_time_limit=3)
-                
-                # Try to transcribe
-                try:
-                    import whisper
-                    model = whisper.load_model("base")
-                    audio_np = np.frombuffer(audio.get_wav_data(), dtype=np.int16).astype(np.float32) / 32768.0
-                    result = model.transcribe(audio_np)
-                    
-                    if result["text"].strip():
-                        return f"✓ Microphone works! I heard: {result['text']}"
-                    else:
-                        return "⚠ Microphone captured audio but no speech detected."
+            print("\n🎤 Testing microphone - say something...")
+            utterance = self._record(context, recognizer, timeout=5, phrase_time_limit=3)
+            
+            # Try to transcribe with the assistant's STT backend, else a shared Whisper model
+            try:
+                audio_np = utterance.as_float32()
+                backend = context.get("stt")
+                if backend is not None:
+                    text = backend.transcribe(audio_np)
+                else:
+                    handle = self._whisper_handle(context)
+                    try:
+                        text = handle.model.transcribe(audio_np, fp16=False)["text"]
+                    finally:
+                        handle.release()
                 
-                except Exception:
-                    # Fallback to Google
-                    text = recognizer.recognize_google(audio)
+                if text.strip():
                     return f"✓ Microphone works! I heard: {text}"
-        
+                else:
+                    return "⚠ Microphone captured audio but no speech detected."
+            
+            except Exception:
+                # Fallback to Google
+                text = recognizer.recognize_google(utterance.to_audio_data())
+                return f"✓ Microphone works! I heard: {text}"
+    
         except sr.WaitTimeoutError:
             return "✗ Microphone test failed: No speech detected. Try speaking louder."
         except Exception as e:
             return f"✗ Microphone test failed: {e}"
     
-    def _test_speakers(self) -> str:
-        """Test speakers by playing a tone"""
+    def _test_speakers(self, context: Dict[str, Any]) -> str:
+        """Test speakers by playing a tone through the assistant's audio player"""
         try:
             print("\n🔊 Testing speakers - playing test tone...")
             
+            player = context.get("player")
+            if player is None:
+                from audio_output import AudioPlayer
+                player = AudioPlayer(44100)
+            
             # Generate a pleasant test tone (440 Hz A note)
             duration = 1.0  # seconds
-            sample_rate = 44100
+            sample_rate = player.sample_rate
             frequency = 440.0
             
             t = np.linspace(0, duration, int(sample_rate * duration))
@@ -168,15 +211,16 @@ class AudioPlugin(Plugin):
             tone[-fade_samples:] *= np.linspace(1, 0, fade_samples)
             tone *= 0.3  # Reduce volume to 30%
             
-            sd.play(tone, sample_rate)
-            sd.wait()
+            player.play(tone)
+            if context.get("player") is None:
+                player.close()
             
             return "✓ Test tone played. Did you hear a beep? If not, check speaker connections and system volume."
         
         except Exception as e:
             return f"✗ Speaker test failed: {e}"
     
-    def _test_audio_loop(self) -> str:
+    def _test_audio_loop(self, context: Dict[str, Any]) -> str:
         """Test full audio loop: play tone and try to capture it"""
         try:
             print("\n🔊 Testing audio loopback...")
@@ -193,8 +237,11 @@ class AudioPlugin(Plugin):
             # Play tone in background
             sd.play(tone, sample_rate, blocking=False)
             
-            # Wait a moment then try to capture
-            time.sleep(0.5)
+            # Wait a moment then try to capture, unless the request was abandoned
+            cancelled = context.get("cancelled") or threading.Event()
+            if cancelled.wait(0.5):
+                sd.stop()
+                return None
             
             print("   Listening with microphone...")
             recognizer = sr.Recognizer()
@@ -202,19 +249,18 @@ class AudioPlugin(Plugin):
             recognizer.dynamic_energy_threshold = False
             
             try:
-                with sr.Microphone() as source:
-                    audio = recognizer.listen(source, timeout=2, phrase_time_limit=1.5)
-                    audio_data = np.frombuffer(audio.get_wav_data(), dtype=np.int16)
-                    
-                    # Check if we captured significant audio
-                    rms = np.sqrt(np.mean(audio_data**2))
-                    
-                    sd.wait()  # Wait for playback to finish
-                    
-                    if rms > 100:
-                        return f"✓ Audio loopback successful! Speakers and microphone are working. (Signal strength: {int(rms)})"
-                    else:
-                        return f"⚠ Weak signal detected ({int(rms)}). Speakers may be too quiet or microphone too far."
+                from audio_capture import rms_int16
+                utterance = self._record(context, recognizer, timeout=2, phrase_time_limit=1.5)
+                
+                # Check if we captured significant audio
+                rms = rms_int16(utterance.samples)
+                
+                sd.wait()  # Wait for playback to finish
+                
+                if rms > 100:
+                    return f"✓ Audio loopback successful! Speakers and microphone are working. (Signal strength: {int(rms)})"
+                else:
+                    return f"⚠ Weak signal detected ({int(rms)}). Speakers may be too quiet or microphone too far."
             
             except sr.WaitTimeoutError:
                 sd.wait()
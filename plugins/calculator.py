@@ -1,66 +1,224 @@
 """
 Calculator Plugin - Perform mathematical calculations
+
+Spoken arithmetic ("what is twenty five times four") is tokenized with one
+precompiled pattern, turned into an expression and evaluated by walking its
+AST. Operand size, exponents and the number of operations are capped, so
+any input evaluates in microseconds.
 """
 
 from plugins import Plugin
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
+from functools import lru_cache
+from decimal import Decimal
+import ast
+import math
+import operator
 import re
 
+PLUGINS = [
+    {
+        "class": "CalculatorPlugin",
+        "description": "Perform mathematical calculations",
+        "triggers": ["calculate", "what is", "what's", "compute", "math"],
+    },
+]
+
+MAX_TOKENS = 64  # Longer "expressions" aren't arithmetic anyone says aloud
+MAX_DIGITS = 30  # Longer digit runs are rejected before int() sees them
+MAX_OPERATIONS = 32
+MAX_MAGNITUDE = 1e30  # Largest operand or intermediate result
+MAX_EXPONENT = 100
+FLOAT_DIGITS = 15  # Significant digits a float result is spoken with
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+    "eighteen": 18, "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_SCALES = {"hundred": 100, "thousand": 1000, "million": 10 ** 6, "billion": 10 ** 9}
+NUMBER_WORDS = tuple(_UNITS) + tuple(_SCALES)
+_OPERATORS = {
+    "plus": "+", "and": "+", "minus": "-", "negative": "-",
+    "times": "*", "multiplied by": "*", "x": "*", "×": "*",
+    "divided by": "/", "over": "/", "÷": "/",
+    "to the power of": "**", "^": "**", "**": "**",
+    "squared": "**2", "cubed": "**3",
+    "+": "+", "-": "-", "*": "*", "/": "/", "(": "(", ")": ")",
+}
+_PREFIX = re.compile(r"\b(?:what(?:'s| is)|calculate|compute)\s+")
+
+
+def _alternation(phrases) -> str:
+    # Longest first, so "multiplied by" wins over shorter overlaps
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+_WORD_PHRASES = [p for p in list(_UNITS) + list(_SCALES) + list(_OPERATORS) if p[0].isalpha()]
+_SYMBOLS = [p for p in _OPERATORS if not p[0].isalpha()]
+_TENS = [w for w, n in _UNITS.items() if n >= 20]
+_ONES = [w for w, n in _UNITS.items() if 0 < n < 10]
+_TOKEN = re.compile(
+    # "1,000" or "12.5"; a longer digit run doesn't match at all
+    rf"\s*(?:(?P<number>(?:\d{{1,3}}(?:,\d{{3}}){{1,9}}|\d{{1,{MAX_DIGITS}}})(?:\.\d{{1,{MAX_DIGITS}}})?)(?!,?\d)"
+    rf"|(?P<compound>(?:{'|'.join(_TENS)})-(?:{'|'.join(_ONES)}))\b"  # "twenty-five"
+    rf"|(?P<word>{_alternation(_WORD_PHRASES)})\b"
+    rf"|(?P<symbol>{_alternation(_SYMBOLS)}))"
+)
+_TRAILING = re.compile(r"[\s.,;:!?]*$")
+
+Token = Union[int, float, str]
+
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow,
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def tokenize(text: str) -> List[Token]:
+    """Numbers and operators in text; ValueError if anything but trailing punctuation is left"""
+    words = []
+    pos = 0
+    while len(words) <= MAX_TOKENS:
+        match = _TOKEN.match(text, pos)
+        if not match:
+            break
+        pos = match.end()
+        if match.group("number"):
+            number = match.group("number").replace(",", "")
+            words.append(float(number) if "." in number else int(number))
+        elif match.group("compound"):
+            words.extend(match.group("compound").split("-"))
+        else:
+            words.append(match.group("word") or match.group("symbol"))
+    if not _TRAILING.match(text, pos):
+        raise ValueError(f"not arithmetic: {text[pos:]!r}")
+    return _combine_number_words(words)
+
+
+def _combine_number_words(words: List[Token]) -> List[Token]:
+    """Fold runs like "two hundred and five" into numbers; the rest become operators"""
+    tokens: List[Token] = []
+    total = current = scale = None
+    for i, word in enumerate(words):
+        if not isinstance(word, str) and total is not None and not current and word < scale:
+            current = word  # "4 thousand 5 hundred"
+            continue
+        if word in _UNITS or word in _SCALES:
+            if total is None:
+                total, current, scale = 0, 0, 0
+                if word in _SCALES and tokens and not isinstance(tokens[-1], str):
+                    current = tokens.pop()  # "5 million"
+            if word in _UNITS:
+                current += _UNITS[word]
+            elif word == "hundred":
+                current = (current or 1) * 100
+            else:
+                total += (current or 1) * _SCALES[word]
+                current, scale = 0, _SCALES[word]
+            continue
+        if (word == "and" and total is not None and i + 1 < len(words)
+                and words[i + 1] in _UNITS):
+            continue  # "one hundred and five"
+        if total is not None:
+            tokens.append(total + current)
+            total = current = scale = None
+        tokens.append(_OPERATORS.get(word, word) if isinstance(word, str) else word)
+    if total is not None:
+        tokens.append(total + current)
+    return tokens
+
+
+def parse_number(text: str) -> Optional[Union[int, float]]:
+    """Value of one number in digits and/or words ("twenty-five", "2 hundred"), else None"""
+    try:
+        tokens = tokenize(text)
+    except ValueError:
+        return None
+    if len(tokens) == 1 and not isinstance(tokens[0], str):
+        return tokens[0]
+    return None
+
+
+@lru_cache(maxsize=256)
+def _parse(expression: str) -> ast.expr:
+    return ast.parse(expression, mode="eval").body
+
+
+def _check(value):
+    if isinstance(value, complex) or abs(value) > MAX_MAGNITUDE or not math.isfinite(value):
+        raise ValueError("result out of range")
+    return value
+
+
+def evaluate(expression: str, max_operations: int = MAX_OPERATIONS):
+    """Evaluate +, -, *, /, ** and parentheses over numbers, within fixed limits"""
+    budget = [max_operations]
+
+    def visit(node):
+        budget[0] -= 1
+        if budget[0] < 0:
+            raise ValueError("expression too long")
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return _check(node.value)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            return _UNARY[type(node.op)](visit(node.operand))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            left, right = visit(node.left), visit(node.right)
+            if isinstance(node.op, ast.Pow):
+                if abs(right) > MAX_EXPONENT:
+                    raise ValueError("exponent too large")
+                # Refuse before computing rather than after
+                if left and right > 0 and right * math.log10(abs(left)) > math.log10(MAX_MAGNITUDE):
+                    raise ValueError("result out of range")
+            return _check(_BINARY[type(node.op)](left, right))
+        raise ValueError(f"unsupported expression: {ast.dump(node)}")
+
+    return visit(_parse(expression))
+
 
 class CalculatorPlugin(Plugin):
-    def __init__(self):
-        super().__init__()
-        self.description = "Perform mathematical calculations"
-        self.triggers = ["calculate", "what is", "what's", "compute", "math"]
-    
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
         """Perform calculation"""
-        # Extract mathematical expression
-        expression = self._extract_expression(user_input)
-        
-        if not expression:
-            return None  # Let Gemini handle it
-        
         try:
+            # Extract mathematical expression
+            expression = self._extract_expression(user_input)
+            if not expression:
+                return None  # Let Gemini handle it
+            
             # Use safe evaluation
             result = self._safe_eval(expression)
-            return f"The answer is {result}."
+            return f"The answer is {self._format(result)}."
         
         except Exception as e:
             return None  # Let Gemini handle complex math
-    
+
     def _extract_expression(self, text: str) -> str:
-        """Extract mathematical expression from text"""
-        # Replace words with operators
-        text = text.lower()
-        text = re.sub(r'\bplus\b|\band\b', '+', text)
-        text = re.sub(r'\bminus\b', '-', text)
-        text = re.sub(r'\btimes\b|\bmultiplied by\b', '*', text)
-        text = re.sub(r'\bdivided by\b', '/', text)
-        
-        # Extract pattern like "what is 5 + 3"
-        patterns = [
-            r"what(?:'s| is)\s+([\d\s\+\-\*/\(\)\.]+)",
-            r"calculate\s+([\d\s\+\-\*/\(\)\.]+)",
-            r"compute\s+([\d\s\+\-\*/\(\)\.]+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                expr = match.group(1).strip()
-                # Validate it's a simple math expression
-                if re.match(r'^[\d\s\+\-\*/\(\)\.]+$', expr):
-                    return expr
-        
-        return ""
-    
+        """Extract mathematical expression from text ("" unless all of it is arithmetic)"""
+        match = _PREFIX.search(text.lower())
+        if not match:
+            return ""
+        try:
+            tokens = tokenize(text.lower()[match.end():])
+        except ValueError:
+            return ""  # Part of the question isn't arithmetic; answering the rest would be wrong
+        if len(tokens) > MAX_TOKENS or not any(not isinstance(t, str) for t in tokens):
+            return ""
+        return " ".join(str(token) for token in tokens)
+
     def _safe_eval(self, expression: str):
         """Safely evaluate mathematical expression"""
-        # Only allow safe mathematical operations
-        allowed_chars = set('0123456789+-*/.() ')
-        if not all(c in allowed_chars for c in expression):
-            raise ValueError("Invalid characters in expression")
-        
-        # Use eval with restricted globals (safe for simple math)
-        return eval(expression, {"__builtins__": {}}, {})
+        return evaluate(expression)
+
+    def _format(self, result) -> str:
+        if isinstance(result, float):
+            result = round(result, 10)
+            if result.is_integer() and abs(result) < 10 ** FLOAT_DIGITS:
+                result = int(result)
+            else:
+                # Only FLOAT_DIGITS digits are real; int() would speak binary noise past them
+                result = format(Decimal(f"{result:.{FLOAT_DIGITS}g}"), "f")
+        return str(result)
@@ -3,17 +3,34 @@ Time Plugin - Get current time and date
 """
 
 from plugins import Plugin
+from plugins.calculator import NUMBER_WORDS, parse_number
 from typing import Dict, Any
 from datetime import datetime
 import re
 
+PLUGINS = [
+    {
+        "class": "TimePlugin",
+        "description": "Get current time, date, or day of week",
+        "triggers": ["time", "date", "what day", "what's the time", "what's today"],
+    },
+    {
+        "class": "TimerPlugin",
+        "description": "Set a timer or alarm",
+        "triggers": ["timer", "timers", "set timer", "remind me", "alarm"],
+    },
+]
+
+
+# An amount in digits or words ("5", "one", "twenty-five", "a hundred and five")
+# followed by a unit; "a"/"an" count as one
+_NUMBER = rf"(?:\d+(?:\.\d+)?|(?:{'|'.join(sorted(NUMBER_WORDS, key=len, reverse=True))})\b)"
+_DURATION = re.compile(
+    rf"\b(an?|{_NUMBER}(?:(?:\s+|-)(?:and\s+)?{_NUMBER})*)\s*(hour|hr|minute|min|second|sec)s?\b"
+)
+
 
 class TimePlugin(Plugin):
-    def __init__(self):
-        super().__init__()
-        self.description = "Get current time, date, or day of week"
-        self.triggers = ["time", "date", "what day", "what's the time", "what's today"]
-    
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
         """Get time/date information"""
         now = datetime.now()
@@ -35,35 +52,52 @@ class TimePlugin(Plugin):
 
 
 class TimerPlugin(Plugin):
-    def __init__(self):
-        super().__init__()
-        self.description = "Set a timer or alarm"
-        self.triggers = ["timer", "set timer", "remind me", "alarm"]
-        self.timers = {}
+    """Timers on the assistant's shared scheduler (context["scheduler"])"""
+    
+    UNITS = {"hour": 3600, "hr": 3600, "minute": 60, "min": 60, "second": 1, "sec": 1}
     
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
         """Handle timer requests"""
-        # Extract duration
-        duration = self._extract_duration(user_input)
+        scheduler = context.get("scheduler")
+        if scheduler is None:
+            return "Timers aren't available right now."
         
-        if duration:
-            # In a real implementation, this would actually set a timer
-            # For now, just acknowledge
-            return f"I would set a timer for {duration}, but timer functionality requires a background task system. This is a demo plugin."
-        else:
-            return "How long should I set the timer for?"
-    
-    def _extract_duration(self, text: str) -> str:
-        """Extract duration from text"""
-        patterns = [
-            r"(\d+)\s*(minute|minutes|min|mins)",
-            r"(\d+)\s*(second|seconds|sec|secs)",
-            r"(\d+)\s*(hour|hours|hr|hrs)",
-        ]
+        user_lower = user_input.lower()
+        if "cancel" in user_lower:
+            timers = scheduler.pending()
+            for timer in timers:
+                scheduler.cancel(timer["id"])
+            return f"Cancelled {len(timers)} timer(s)." if timers else "There are no timers to cancel."
+        
+        # Extract duration
+        seconds = self._extract_duration(user_input)
         
-        for pattern in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                return f"{match.group(1)} {match.group(2)}"
+        if seconds:
+            label = format_duration(seconds)
+            scheduler.schedule(seconds, label)
+            return f"Timer set for {label}."
         
-        return ""
+        timers = scheduler.pending()
+        if timers and ("left" in user_lower or "timers" in user_lower or "how long" in user_lower):
+            remaining = [format_duration(t["due"] - datetime.now().timestamp()) for t in timers]
+            return f"You have {len(timers)} timer(s): {', '.join(r + ' left' for r in remaining)}."
+        return "How long should I set the timer for?"
+    
+    def _extract_duration(self, text: str) -> int:
+        """Total seconds in durations like "1 hour 30 minutes" or "one minute" (0 if none)"""
+        total = 0
+        for amount, unit in _DURATION.findall(text.lower()):
+            value = 1 if amount in ("a", "an") else parse_number(amount)
+            if value:
+                total += value * self.UNITS[unit]
+        return int(round(total))
+
+
+def format_duration(seconds: float) -> str:
+    """Spoken form of a duration, e.g. "1 hour 5 minutes" """
+    seconds = max(0, int(round(seconds)))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    parts = [f"{value} {unit}{'s' if value != 1 else ''}"
+             for value, unit in ((hours, "hour"), (minutes, "minute"), (seconds, "second")) if value]
+    return " ".join(parts) or "0 seconds"
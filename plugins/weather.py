@@ -1,39 +1,53 @@
 """
 Weather Plugin - Get current weather information
 Requires: requests
+
+Lookups go through the assistant's shared WeatherClient (context["weather"]),
+which pools connections and caches reports per location.
 """
 
 from plugins import Plugin
 from typing import Dict, Any
 import re
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
+PLUGINS = [
+    {
+        "class": "WeatherPlugin",
+        "description": "Get current weather information for a location",
+        "triggers": ["weather", "temperature", "forecast", "how hot", "how cold"],
+        "timeout": 6,  # Covers the 5 s request timeout
+    },
+]
+
 
 class WeatherPlugin(Plugin):
     def __init__(self):
         super().__init__()
-        self.description = "Get current weather information for a location"
-        self.triggers = ["weather", "temperature", "forecast", "how hot", "how cold"]
+        self.client = None  # Used when the assistant doesn't provide one
     
     def execute(self, user_input: str, context: Dict[str, Any]) -> str:
         """Get weather information"""
-        try:
-            import requests
-        except ImportError:
+        if requests is None:
             return "Weather plugin requires 'requests' library. Install with: pip install requests"
         
+        client = context.get("weather") or self._default_client()
+        
         # Extract location from input
-        location = self._extract_location(user_input)
+        location = self._extract_location(user_input, client.home_locations)
         
         if not location:
             return "Where would you like to know the weather for?"
         
         try:
             # Using wttr.in API (no key required)
-            url = f"https://wttr.in/{location}?format=j1"
-            response = requests.get(url, timeout=5)
+            data = client.get(location)
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 current = data['current_condition'][0]
                 
                 temp_c = current['temp_C']
@@ -52,8 +66,14 @@ class WeatherPlugin(Plugin):
         except Exception as e:
             return f"Sorry, I encountered an error getting the weather: {str(e)}"
     
-    def _extract_location(self, text: str) -> str:
-        """Extract location from user input"""
+    def _default_client(self):
+        if self.client is None:
+            from weather_client import WeatherClient
+            self.client = WeatherClient()
+        return self.client
+    
+    def _extract_location(self, text: str, home_locations=()) -> str:
+        """Extract location from user input (the first home location if none is named)"""
         # Common patterns
         patterns = [
             r"weather in ([\w\s]+)",
@@ -67,6 +87,9 @@ class WeatherPlugin(Plugin):
             if match:
                 return match.group(1).strip()
         
+        if home_locations:
+            return home_locations[0]
+        
         # Check for common location words at the end
         words = text.split()
         if len(words) >= 2:
@@ -0,0 +1,185 @@
+"""
+LLM response cache
+
+Repeated questions ("what can you do", "tell me a joke", greetings) are
+answered from a cache instead of a network round-trip. Entries are keyed by
+personality and a normalized transcript; follow-ups that lean on the
+conversation ("why?", "tell me more about it") are also keyed on the last
+exchange, so they are only reused after the same one. They expire after a TTL,
+are bounded LRU, are dropped for a personality when its system prompt
+changes, and persist to a JSON file written in the background.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Only disfluencies: words like "like", "so" or "the" change what is being asked
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm"}
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, strip punctuation and disfluencies, collapse whitespace"""
+    words = re.sub(r"[^\w\s']", " ", text.lower()).replace("'", "").split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+# Follow-ups: short queries, or ones that refer back to the conversation
+FOLLOW_UP_MAX_WORDS = 3
+FOLLOW_UP_LEADS = {"why", "and", "but", "also", "so", "then", "what about", "how about"}
+REFERENCE_WORDS = {"it", "its", "that", "this", "these", "those", "they", "them", "their",
+                   "he", "him", "his", "she", "her", "there", "more", "else", "again"}
+
+
+def is_follow_up(normalized: str) -> bool:
+    """Whether a normalized query probably depends on the previous exchange"""
+    words = normalized.split()
+    return (len(words) <= FOLLOW_UP_MAX_WORDS
+            or any(normalized.startswith(lead + " ") for lead in FOLLOW_UP_LEADS)
+            or any(word in REFERENCE_WORDS for word in words))
+
+
+def _prompt_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Bounded, expiring cache of LLM replies, optionally persisted to disk.
+
+    Args:
+        path: JSON file to load from and save to (None = memory only)
+        ttl: Seconds a reply stays valid
+        max_entries: Least recently used entries are evicted past this
+        save_delay: Seconds changes are collected before the file is rewritten
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400, max_entries: int = 500,
+                 save_delay: float = 5.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # Oldest first
+        self._prompts = {}  # personality -> hash of its system prompt
+        self._lock = threading.Lock()
+        self._save_timer = None
+        if path:
+            self._load()
+            atexit.register(self.close)
+
+    def _key(self, personality: str, text: str, context: str = "") -> Optional[str]:
+        normalized = normalize_query(text)
+        if not normalized:
+            return None
+        key = f"{personality}\x1f{normalized}"
+        if context and is_follow_up(normalized):
+            key += f"\x1f{_prompt_hash(context)}"
+        return key
+
+    def bind_personality(self, personality: str, system_prompt: str):
+        """Drop a personality's entries if its system prompt changed since they were cached"""
+        digest = _prompt_hash(system_prompt)
+        with self._lock:
+            if self._prompts.get(personality) == digest:
+                return
+            stale = [k for k, e in self._entries.items() if e["personality"] == personality]
+            for key in stale:
+                del self._entries[key]
+            self._prompts[personality] = digest
+        if stale:
+            print(f"🗑️  {personality}'s prompt changed, dropped {len(stale)} cached replies")
+        self._schedule_save()
+
+    def get(self, personality: str, text: str, context: str = "") -> Optional[str]:
+        """Cached reply to text; context (the last exchange) only matters for follow-ups"""
+        key = self._key(personality, text, context)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            if entry is not None and time.time() - entry["created"] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["reply"]
+
+    def put(self, personality: str, text: str, reply: str, context: str = ""):
+        key = self._key(personality, text, context)
+        if not key or not reply:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {"personality": personality, "reply": reply, "created": time.time()}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._schedule_save()
+
+    def _schedule_save(self):
+        """Save save_delay seconds from now on a timer thread, off the reply path"""
+        if not self.path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return  # Already pending; it will include this change
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def close(self):
+        """Write any pending changes now"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load response cache: {e}")
+            return
+        now = time.time()
+        self._prompts = data.get("prompts", {})
+        for key, entry in data.get("entries", []):
+            if now - entry.get("created", 0) <= self.ttl:
+                self._entries[key] = entry
+
+    def save(self):
+        """Write the cache to its file (atomically)"""
+        if not self.path:
+            return
+        with self._lock:
+            self._save_timer = None
+            data = {"prompts": dict(self._prompts), "entries": list(self._entries.items())}
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save response cache: {e}")
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def format_stats(self) -> str:
+        ratio = f"{self.hit_ratio:.0%}" if self.hit_ratio is not None else "-"
+        return (f"Response cache: {len(self._entries)} entries, "
+                f"{self.hits} hits / {self.misses} misses ({ratio})")
@@ -0,0 +1,178 @@
+"""
+Background timer scheduler
+
+One thread keeps every pending timer in a heap and sleeps until the earliest
+deadline (or until an earlier timer is added), so thousands of idle timers
+cost nothing. Fired timers are handed to a callback -- the assistant queues
+them as events and announces them between turns. Pending timers are saved to
+a JSON file (at most once per save_interval, by the scheduler thread) and
+restored on the next start; ones that came due while the assistant was off
+fire immediately, marked as missed.
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Scheduler:
+    """Heap-based one-shot timers on a single thread.
+
+    Args:
+        on_fire: Called (on the scheduler thread) with a copy of each timer
+            as it fires
+        path: JSON file pending timers are persisted to (None = memory only)
+        save_interval: Minimum seconds between writes of the file
+    """
+
+    def __init__(self, on_fire: Callable[[dict], None], path: Optional[str] = None,
+                 save_interval: float = 1.0):
+        self.on_fire = on_fire
+        self.path = path
+        self.save_interval = save_interval
+        self._heap: List[Tuple[float, int]] = []  # (due, id); cancelled ids are skipped lazily
+        self._timers: Dict[int, dict] = {}
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._dirty = False  # Timers changed since the last save
+        self._last_save = 0.0
+        self._thread = None
+        if path:
+            self._load()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="scheduler")
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread and write any unsaved changes"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._dirty:
+            self.save()
+
+    def _changed(self):
+        # Caller holds the lock; wake the thread so it schedules a save
+        if not self._dirty:
+            self._dirty = True
+            self._cond.notify()
+
+    def schedule(self, delay: float, label: str = "") -> dict:
+        """Add a timer firing delay seconds from now"""
+        now = time.time()
+        with self._cond:
+            timer = {"id": self._next_id, "label": label, "duration": delay,
+                     "created": now, "due": now + delay}
+            self._next_id += 1
+            self._timers[timer["id"]] = timer
+            heapq.heappush(self._heap, (timer["due"], timer["id"]))
+            if self._heap[0][1] == timer["id"]:
+                self._cond.notify()  # New earliest deadline
+            self._changed()
+        return dict(timer)
+
+    def cancel(self, timer_id: int) -> bool:
+        with self._cond:
+            if self._timers.pop(timer_id, None) is None:
+                return False
+            # Compact once most heap entries are dead
+            if len(self._heap) > 2 * len(self._timers) + 16:
+                self._heap = [(due, i) for due, i in self._heap if i in self._timers]
+                heapq.heapify(self._heap)
+            self._changed()
+        return True
+
+    def pending(self) -> List[dict]:
+        """Pending timers, soonest first"""
+        with self._cond:
+            return sorted((dict(t) for t in self._timers.values()), key=lambda t: t["due"])
+
+    def _pop_due(self) -> List[dict]:
+        due = []
+        now = time.time()
+        while self._heap and (self._heap[0][1] not in self._timers or self._heap[0][0] <= now):
+            _, timer_id = heapq.heappop(self._heap)
+            timer = self._timers.pop(timer_id, None)
+            if timer is not None:
+                due.append(timer)
+        if due:
+            self._dirty = True
+        return due
+
+    def _save_due(self) -> bool:
+        return self._dirty and time.time() - self._last_save >= self.save_interval
+
+    def _next_wakeup(self) -> Optional[float]:
+        """Seconds until the next deadline or pending save (None = nothing to do)"""
+        wakeups = []
+        if self._heap:
+            wakeups.append(self._heap[0][0])
+        if self._dirty:
+            wakeups.append(self._last_save + self.save_interval)
+        return max(0.0, min(wakeups) - time.time()) if wakeups else None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._pop_due()
+                while not due and not self._save_due() and not self._stopped:
+                    self._cond.wait(self._next_wakeup())
+                    due = self._pop_due()
+                if self._stopped:
+                    # Put back anything just popped so stop() saves it; it fires as
+                    # missed on the next start instead of vanishing
+                    for timer in due:
+                        self._timers[timer["id"]] = timer
+                        heapq.heappush(self._heap, (timer["due"], timer["id"]))
+                    return
+                save = self._save_due()
+            if save:
+                self.save()
+            for timer in due:
+                try:
+                    self.on_fire(timer)
+                except Exception as e:
+                    print(f"⚠️  Timer callback error: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                timers = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load timers: {e}")
+            return
+        now = time.time()
+        for timer in timers:
+            timer["missed"] = timer["due"] < now
+            self._timers[timer["id"]] = timer
+            self._heap.append((timer["due"], timer["id"]))
+            self._next_id = max(self._next_id, timer["id"] + 1)
+        heapq.heapify(self._heap)
+        if timers:
+            print(f"⏰ Restored {len(timers)} timer(s)")
+
+    def save(self):
+        """Write pending timers to the file (atomically)"""
+        with self._cond:
+            self._dirty = False
+            self._last_save = time.time()
+        if not self.path:
+            return
+        timers = self.pending()
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(timers, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save timers: {e}")
@@ -0,0 +1,192 @@
+"""
+Sentence-pipelined text-to-speech
+
+Streamed LLM text is cut into sentences (or clauses, when a sentence runs
+long) as it arrives. Each segment is synthesized on one thread and played on
+another, so the first sentence is audible while the rest of the reply is
+still being generated and synthesized.
+"""
+
+import queue
+import re
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break. A period at the very end of the buffer isn't a
+# boundary yet -- the next chunk might continue "3." as "3.5".
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|\n+")
+_CLAUSE_END = re.compile(r"[,;:—–]\s+")
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+
+class SentenceSegmenter:
+    """Incrementally splits streamed text into speakable segments.
+
+    Args:
+        min_chars: Shorter sentences are merged with the next one
+        clause_chars: Without a sentence end, cut at a clause boundary once
+            this much text is buffered
+        first_clause_chars: Same, for the first segment (kept small so audio
+            starts early)
+    """
+
+    def __init__(self, min_chars: int = 12, clause_chars: int = 120, first_clause_chars: int = 60):
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self.first_clause_chars = first_clause_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the segments it completed"""
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+                self._emitted += 1
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """End of stream: whatever is left, if anything"""
+        segment = self._buffer.strip()
+        self._buffer = ""
+        if segment:
+            self._emitted += 1
+            return segment
+        return None
+
+    def _find_cut(self) -> Optional[int]:
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[:match.start()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            last_word = candidate.rsplit(None, 1)[-1].rstrip(".").lower()
+            if self._buffer[match.start()] == "." and last_word in _ABBREVIATIONS:
+                continue
+            return match.end()
+
+        limit = self.first_clause_chars if self._emitted == 0 else self.clause_chars
+        if len(self._buffer) >= limit:
+            for match in _CLAUSE_END.finditer(self._buffer):
+                if match.start() >= self.min_chars:
+                    return match.end()
+        return None
+
+
+_END = object()
+
+
+class SpeechPipeline:
+    """Synthesizes and plays text segments concurrently.
+
+    Args:
+        synthesize: Function taking a text segment and yielding float32 audio chunks
+        play: Function playing one audio chunk (may block until it is queued/played)
+        segmenter: Splits fed text into segments (default SentenceSegmenter())
+        max_pending: Synthesized chunks allowed to wait for playback
+    """
+
+    def __init__(self, synthesize: Callable[[str], Iterable[np.ndarray]],
+                 play: Callable[[np.ndarray], None],
+                 segmenter: Optional[SentenceSegmenter] = None, max_pending: int = 8):
+        self.synthesize = synthesize
+        self.play = play
+        self.segmenter = segmenter or SentenceSegmenter()
+        self.started = time.perf_counter()
+        self.first_synthesis: Optional[float] = None  # Seconds from start to first synthesis
+        self.first_audio: Optional[float] = None  # Seconds from start to first playback
+        self.segments = 0
+        self._cancelled = threading.Event()
+        self._text = queue.Queue()
+        self._audio = queue.Queue(maxsize=max_pending)
+        self._synth_thread = threading.Thread(target=self._synth_loop, daemon=True, name="tts-synth")
+        self._play_thread = threading.Thread(target=self._play_loop, daemon=True, name="tts-play")
+        self._synth_thread.start()
+        self._play_thread.start()
+
+    def feed(self, text: str):
+        """Add streamed text; complete segments are queued for synthesis"""
+        for segment in self.segmenter.feed(text):
+            self._submit(segment)
+
+    def say(self, text: str):
+        """Queue a complete text, bypassing segmentation"""
+        self._submit(text)
+
+    def close(self):
+        """No more text: flush the last segment"""
+        rest = self.segmenter.flush()
+        if rest:
+            self._submit(rest)
+        self._text.put(_END)
+
+    def wait(self):
+        """Block until everything queued has been played"""
+        self._synth_thread.join()
+        self._play_thread.join()
+
+    def cancel(self):
+        """Stop synthesizing and playing; pending audio is dropped"""
+        self._cancelled.set()
+        self._text.put(_END)
+        try:
+            while True:
+                self._audio.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _submit(self, segment: str):
+        self.segments += 1
+        self._text.put(segment)
+
+    def _synth_loop(self):
+        try:
+            while not self._cancelled.is_set():
+                segment = self._text.get()
+                if segment is _END:
+                    break
+                if self.first_synthesis is None:
+                    self.first_synthesis = time.perf_counter() - self.started
+                try:
+                    for chunk in self.synthesize(segment):
+                        if self._cancelled.is_set():
+                            break
+                        self._put_audio(chunk)
+                except Exception as e:
+                    print(f"\n❌ Speech synthesis error: {e}")
+        finally:
+            self._put_audio(_END)
+
+    def _put_audio(self, item):
+        # Bounded put that still notices cancellation
+        while True:
+            try:
+                self._audio.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._cancelled.is_set() and item is not _END:
+                    return
+
+    def _play_loop(self):
+        while True:
+            chunk = self._audio.get()
+            if chunk is _END:
+                break
+            if self._cancelled.is_set():
+                continue
+            if self.first_audio is None:
+                self.first_audio = time.perf_counter() - self.started
+            try:
+                self.play(chunk)
+            except Exception as e:
+                print(f"\n❌ Audio playback error: {e}")
@@ -0,0 +1,104 @@
+"""
+Startup orchestrator
+
+Runs independent initializers concurrently on a thread pool, honouring
+declared dependencies, and records how long each one took so slow
+components are easy to spot.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class StartupTask:
+    def __init__(self, name: str, func: Callable[[], None], after: Iterable[str] = (), required: bool = True):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.required = required
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class StartupOrchestrator:
+    """Runs named initializers in parallel once their dependencies have finished"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.tasks: Dict[str, StartupTask] = {}
+        self._t0 = None
+        self._total = None
+
+    def add(self, name: str, func: Callable[[], None], after: Iterable[str] = (), required: bool = True):
+        """Register an initializer; `after` names tasks that must finish first"""
+        self.tasks[name] = StartupTask(name, func, after, required)
+
+    def run(self):
+        """Run every task; re-raises the first failure of a required task once all have settled"""
+        for task in self.tasks.values():
+            missing = [dep for dep in task.after if dep not in self.tasks]
+            if missing:
+                raise ValueError(f"Startup task '{task.name}' depends on unknown task(s): {missing}")
+
+        self._t0 = time.perf_counter()
+        pending = dict(self.tasks)
+        done = set()
+        running = {}
+
+        def call(task: StartupTask):
+            task.started = time.perf_counter()
+            try:
+                task.func()
+            except BaseException as e:
+                task.error = e
+            finally:
+                task.finished = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as pool:
+            while pending or running:
+                scheduled = True
+                while scheduled:
+                    scheduled = False
+                    for name, task in list(pending.items()):
+                        if not all(dep in done for dep in task.after):
+                            continue
+                        del pending[name]
+                        scheduled = True
+                        failed = [dep for dep in task.after if self.tasks[dep].error is not None]
+                        if failed:
+                            task.error = RuntimeError(f"skipped, depends on failed {', '.join(failed)}")
+                            done.add(name)
+                        else:
+                            running[pool.submit(call, task)] = name
+                if not running:
+                    if pending:
+                        raise ValueError(f"Circular startup dependencies between: {', '.join(pending)}")
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+
+        self._total = time.perf_counter() - self._t0
+        for task in self.tasks.values():
+            if task.required and task.error is not None:
+                raise task.error
+
+    def format_timings(self) -> str:
+        """Per-component startup timing table"""
+        lines = [f"⏱️  Startup timing (total {self._total or 0.0:.2f}s):",
+                 f"   {'component':<20} {'start':>7} {'time':>7}  status"]
+        rows: List[StartupTask] = sorted(self.tasks.values(), key=lambda t: t.started or float("inf"))
+        for task in rows:
+            start = f"{task.started - self._t0:.2f}s" if task.started is not None else "-"
+            duration = f"{task.duration:.2f}s" if task.duration is not None else "-"
+            status = "ok" if task.error is None else f"failed: {task.error}"
+            lines.append(f"   {task.name:<20} {start:>7} {duration:>7}  {status}")
+        return "\n".join(lines)
@@ -0,0 +1,128 @@
+"""
+Incremental streaming transcription
+
+While a command is being recorded, StreamingTranscriber re-decodes the
+growing utterance buffer every few hundred milliseconds. Words that two
+successive hypotheses agree on are committed (local agreement), the rest is
+reported as tentative text, and the final transcript only needs one more
+decode of the tail once end-of-speech is confirmed.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+def agreed_prefix(previous: List[str], current: List[str]) -> int:
+    """Number of leading words two hypotheses agree on (case/punctuation-insensitive)"""
+    count = 0
+    for a, b in zip(previous, current):
+        if a.strip(".,!?;:").lower() != b.strip(".,!?;:").lower():
+            break
+        count += 1
+    return count
+
+
+class StreamingTranscriber:
+    """Re-decodes a growing PcmBuffer and emits partial hypotheses.
+
+    Args:
+        decode: Function taking float32 16 kHz audio and returning text
+        interval: Seconds between re-decodes
+        min_audio: Seconds of audio needed before the first decode
+        on_partial: Called as on_partial(committed_text, tentative_text)
+    """
+
+    def __init__(self, decode: Callable[[np.ndarray], str], interval: float = 0.3,
+                 min_audio: float = 0.5, on_partial: Optional[Callable[[str, str], None]] = None):
+        self.decode = decode
+        self.interval = interval
+        self.min_audio = min_audio
+        self.on_partial = on_partial
+        self.committed: List[str] = []
+        self.decodes = 0
+        self._previous: List[str] = []
+        self._hypothesis = ""
+        self._decoded_length = 0
+        self._utterance = None
+        self._scratch = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self.committed)
+
+    def start(self, utterance):
+        """Start re-decoding `utterance` (a PcmBuffer being filled by the endpointer)"""
+        self._utterance = utterance
+        if self._scratch is None or len(self._scratch) < utterance.capacity:
+            self._scratch = np.zeros(utterance.capacity, dtype=np.float32)
+        self.committed = []
+        self.decodes = 0
+        self._previous = []
+        self._hypothesis = ""
+        self._decoded_length = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="streaming-stt")
+        self._thread.start()
+
+    def cancel(self):
+        """Stop re-decoding and wait for any decode in flight"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def finish(self) -> str:
+        """Stop streaming and return the final transcript for the whole utterance.
+
+        If the last partial decode already covered all of the audio it is
+        reused as-is; otherwise the full utterance is decoded once more.
+        """
+        self.cancel()
+        if self._utterance is None or self._utterance.length == 0:
+            return ""
+        if self._decoded_length >= self._utterance.length:
+            return self._hypothesis
+        return self._decode_current()
+
+    def _decode_current(self) -> str:
+        """Decode everything captured so far (into this transcriber's own float buffer)"""
+        n = self._utterance.length
+        audio = self._scratch[:n]
+        np.multiply(self._utterance.pcm[:n], np.float32(1.0 / 32768.0), out=audio, dtype=np.float32)
+        text = self.decode(audio).strip()
+        self.decodes += 1
+        self._decoded_length = n
+        self._hypothesis = text
+        return text
+
+    def _loop(self):
+        min_samples = int(self.min_audio * self._utterance.sample_rate)
+        step = int(self.interval * self._utterance.sample_rate)
+        while not self._stop.wait(self.interval):
+            length = self._utterance.length
+            if length < min_samples or length - self._decoded_length < step:
+                continue
+            started = time.perf_counter()
+            try:
+                words = self._decode_current().split()
+            except Exception as e:
+                print(f"\n⚠️  Streaming decode failed: {e}")
+                return
+
+            # Local agreement: commit what this and the previous hypothesis share
+            agreed = agreed_prefix(self._previous, words)
+            if agreed > len(self.committed):
+                self.committed = words[:agreed]
+            self._previous = words
+            if self.on_partial:
+                self.on_partial(self.committed_text, " ".join(words[len(self.committed):]))
+
+            # Don't let slow decodes queue up back to back
+            elapsed = time.perf_counter() - started
+            if elapsed > self.interval:
+                self._stop.wait(min(elapsed, 1.0))
@@ -0,0 +1,256 @@
+"""
+Speech-to-text backends
+
+Every local STT engine implements the same small interface (load, warm-up,
+transcribe, stream) and registers itself under the name used in
+SPEECH_RECOGNITION_ENGINE. The assistant picks a backend by name and never
+touches engine-specific APIs. Google STT is not a backend here; it stays the
+online fallback when no local engine can be loaded.
+"""
+
+import inspect
+from typing import Callable, Dict, Optional, Type
+
+import numpy as np
+
+import model_registry as models
+from streaming_stt import StreamingTranscriber
+
+
+class STTBackend:
+    """Base class for local speech-to-text engines.
+
+    Args:
+        model_name: Model size/name (e.g. "base")
+        device: "cpu" or "cuda"
+        language: Short language code passed to the decoder (e.g. "en")
+        sample_rate: Rate of the float32 mono audio handed to transcribe()
+    """
+
+    name = "base"
+    install_hint = ""
+
+    def __init__(self, model_name: str, device: str = "cpu", language: Optional[str] = None,
+                 sample_rate: int = 16000):
+        self.model_name = model_name
+        self.device = device
+        self.language = language
+        self.sample_rate = sample_rate
+        self.handle = None  # Handle from the model registry
+        self.last_mode = None  # How the last transcribe() call decoded (for logging)
+
+    @property
+    def model(self):
+        return self.handle.model if self.handle is not None else None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.model_name})"
+
+    def load(self):
+        """Load (or share) the model; raises ImportError if the engine isn't installed"""
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Run one decode on silence so the first real command doesn't pay one-time costs"""
+        self.transcribe(np.zeros(self.sample_rate // 2, dtype=np.float32))
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Transcribe float32 mono audio at sample_rate"""
+        raise NotImplementedError
+
+    def stream(self, interval: float = 0.3,
+               on_partial: Optional[Callable[[str, str], None]] = None) -> StreamingTranscriber:
+        """A streaming transcriber that re-decodes the growing utterance with this backend"""
+        return StreamingTranscriber(self.transcribe, interval=interval, on_partial=on_partial)
+
+    def log_fields(self) -> dict:
+        """Engine details recorded with each utterance"""
+        return {"engine": self.name, "model": self.model_name, "device": self.device}
+
+    def release(self):
+        if self.handle is not None:
+            self.handle.release()
+            self.handle = None
+
+
+class WhisperBackend(STTBackend):
+    """openai-whisper (PyTorch)
+
+    Short commands are decoded in a single greedy pass over the real-length
+    mel; longer audio goes through whisper's transcribe().
+    """
+
+    name = "whisper"
+    install_hint = "pip install openai-whisper"
+
+    def __init__(self, model_name: str, device: str = "cpu", language: Optional[str] = None,
+                 sample_rate: int = 16000, fp16: bool = False, decode_mode: str = "auto",
+                 short_max_seconds: float = 10.0):
+        super().__init__(model_name, device, language, sample_rate)
+        self.fp16 = fp16
+        self.decode_mode = decode_mode
+        self.short_max_seconds = short_max_seconds
+
+    def load(self):
+        self.handle = models.acquire_whisper(self.model_name, self.device)
+
+    def log_fields(self) -> dict:
+        fields = super().log_fields()
+        fields["fp16"] = bool(self.fp16)
+        return fields
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        duration = len(audio) / self.sample_rate
+        self.last_mode = self._mode_for(duration)
+        if self.last_mode == "short":
+            return self._decode_short(audio, duration)
+
+        # Use whisper's audio helpers to pad/trim to the model's expected length
+        try:
+            from whisper import audio as whisper_audio
+            audio = whisper_audio.pad_or_trim(audio)
+        except Exception:
+            # If whisper.audio helpers aren't available, proceed with raw audio
+            pass
+        result = self.model.transcribe(audio, fp16=self.fp16, language=self.language)
+        return result.get("text", "").strip()
+
+    def stream(self, interval: float = 0.3,
+               on_partial: Optional[Callable[[str, str], None]] = None) -> StreamingTranscriber:
+        # Partial hypotheses always take the short path
+        return StreamingTranscriber(
+            lambda audio: self._decode_short(audio, len(audio) / self.sample_rate),
+            interval=interval,
+            on_partial=on_partial
+        )
+
+    def _mode_for(self, duration: float) -> str:
+        """Pick 'short' (direct decode) or 'full' (transcribe) for an utterance"""
+        if duration >= 30 or self.decode_mode == "full":
+            return "full"
+        if self.decode_mode == "short" or duration <= self.short_max_seconds:
+            return "short"
+        return "full"
+
+    def _decode_short(self, audio: np.ndarray, duration: float) -> str:
+        """Decode a short command in a single greedy pass.
+
+        The mel spectrogram is computed on the real-length audio and only then
+        padded to the encoder's 30 s window, instead of running the STFT over
+        28 s of zeros. One temperature-0 decode, no fallback retries, and the
+        token budget scales with the audio length so decoding stops early.
+        """
+        import torch
+        import whisper
+        from whisper.audio import N_FRAMES
+
+        model = self.model
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels, device=model.device)
+        if mel.shape[-1] < N_FRAMES:
+            # Fill with the value whisper's own padding would produce (the
+            # spectrogram floor, 8 log10 units below its peak, or log10(1e-10))
+            silence = max(float(mel.max()) - 2.0, -1.5)
+            mel = torch.nn.functional.pad(mel, (0, N_FRAMES - mel.shape[-1]), value=silence)
+        else:
+            mel = mel[:, :N_FRAMES]
+
+        options = whisper.DecodingOptions(
+            task="transcribe",
+            language=self.language,
+            temperature=0.0,
+            without_timestamps=True,
+            sample_len=max(16, int(duration * 12)),
+            fp16=bool(self.fp16) and self.device == "cuda"
+        )
+        result = whisper.decode(model, mel, options)
+        return result.text.strip()
+
+
+class FasterWhisperBackend(STTBackend):
+    """faster-whisper (CTranslate2), int8 on CPU by default
+
+    Args:
+        compute_type: CTranslate2 compute type ("int8", "int8_float16",
+            "float16", "float32"); "auto" means int8 on CPU, float16 on CUDA
+        cpu_threads: Intra-op threads; 0 leaves the CTranslate2 default
+    """
+
+    name = "faster-whisper"
+    install_hint = "pip install faster-whisper"
+
+    def __init__(self, model_name: str, device: str = "cpu", language: Optional[str] = None,
+                 sample_rate: int = 16000, compute_type: str = "auto", cpu_threads: int = 0):
+        super().__init__(model_name, device, language, sample_rate)
+        if compute_type == "auto":
+            compute_type = "int8" if device == "cpu" else "float16"
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.model_name}, {self.compute_type})"
+
+    def load(self):
+        self.handle = models.acquire_faster_whisper(self.model_name, self.device,
+                                                    self.compute_type, self.cpu_threads)
+
+    def log_fields(self) -> dict:
+        fields = super().log_fields()
+        fields["compute_type"] = self.compute_type
+        return fields
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        # Commands are short: greedy, single temperature, no timestamps and no
+        # conditioning on earlier text, mirroring whisper's short path
+        self.last_mode = self.compute_type
+        segments, _ = self.model.transcribe(
+            audio,
+            language=self.language,
+            beam_size=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            without_timestamps=True
+        )
+        # Segments are generated lazily; joining them runs the decode
+        return "".join(segment.text for segment in segments).strip()
+
+
+BACKENDS: Dict[str, Type[STTBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+# Tried in order for SPEECH_RECOGNITION_ENGINE=auto
+AUTO_ORDER = [FasterWhisperBackend.name, WhisperBackend.name]
+
+
+def register_backend(cls: Type[STTBackend]):
+    """Make a backend selectable by its name (usable as a class decorator)"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def parse_engine(engine: str):
+    """Split an engine setting into (backend names to try, streaming flag).
+
+    "whisper-streaming" selects the whisper backend with streaming enabled;
+    "google" (or an unknown name) yields no local backends.
+    """
+    engine = engine.lower()
+    streaming = engine.endswith("-streaming")
+    if streaming:
+        engine = engine[:-len("-streaming")]
+    if engine == "auto":
+        return list(AUTO_ORDER), streaming
+    if engine in BACKENDS:
+        return [engine], streaming
+    return [], streaming
+
+
+def create_backend(name: str, model_name: str, **options) -> STTBackend:
+    """Instantiate a registered backend, passing only the options it accepts"""
+    cls = BACKENDS[name]
+    accepted = inspect.signature(cls.__init__).parameters
+    return cls(model_name, **{k: v for k, v in options.items() if k in accepted})
+
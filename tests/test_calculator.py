@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Calculator parsing cases (run directly or with pytest)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.calculator import CalculatorPlugin
+
+# (question, expected reply; None = left to the LLM)
+CASES = [
+    ("What is 2 plus 2?", "The answer is 4."),
+    ("what is twenty five times four", "The answer is 100."),
+    ("what is twenty-five plus five", "The answer is 30."),
+    ("What is 1,000 plus 2,000?", "The answer is 3000."),
+    ("what is one hundred and five divided by five", "The answer is 21."),
+    ("calculate 4 thousand 5 hundred plus 1", "The answer is 4501."),
+    ("what is 5 million minus 1", "The answer is 4999999."),
+    ("what's 3 squared", "The answer is 9."),
+    ("what is 999999999999999999999999999999.99999999999 ** 1", "The answer is 1000000000000000000000000000000."),
+    ("what is 0.1 plus 0.2", "The answer is 0.3."),
+    ("What is 15% of 200?", None),
+    ("what is 1e5", None),
+    ("what is 5 plus", None),
+    ("what is 5 and my name", None),
+    ("what is the time", None),
+    ("calculate 9**9**9", None),
+    ("what is " + "9" * 5000, None),
+]
+
+
+def test_calculator():
+    plugin = CalculatorPlugin()
+    for question, expected in CASES:
+        assert plugin.execute(question, {}) == expected, question
+
+
+if __name__ == "__main__":
+    plugin = CalculatorPlugin()
+    failures = 0
+    for question, expected in CASES:
+        reply = plugin.execute(question, {})
+        ok = reply == expected
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {question[:40]!r} -> {reply!r}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Command capture around the wake acknowledgment (run directly or with pytest)"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from audio_capture import AudioRingBuffer, Endpointer, PlaybackMute, rms_int16
+from main import VoiceAssistant
+
+BLOCK = 512
+BLOCK_S = 0.01  # Wall-clock time per simulated 32 ms block (about 3x real time)
+USER, ECHO = 2000, 8000  # Amplitudes of the user's speech and of our own voice
+
+
+def capture(script):
+    """Run the wake acknowledgment and command capture over a scripted microphone.
+
+    script is a list of (amplitude, blocks); while the acknowledgment plays
+    the microphone hears ECHO instead. Returns (captured samples, spoken).
+    """
+    ring = AudioRingBuffer(16000 * 30)
+    speaking = threading.Event()
+    spoken = []
+
+    def speak(text):
+        spoken.append(text)
+        speaking.set()
+        time.sleep(20 * BLOCK_S)
+        speaking.clear()
+
+    assistant = VoiceAssistant.__new__(VoiceAssistant)
+    assistant.personality = {"name": "Test"}
+    assistant.playback_mute = PlaybackMute(ring)
+    assistant.speech_started = threading.Event()
+    assistant.speak = speak
+
+    def feed():
+        for amplitude, blocks in script:
+            for _ in range(blocks):
+                ring.write(np.full(BLOCK, ECHO if speaking.is_set() else amplitude, dtype=np.int16))
+                time.sleep(BLOCK_S)
+
+    reader = ring.reader()  # Positioned at the end of the wake keyword
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    assistant._speak_acknowledgment("How can I help?")
+    endpointer = Endpointer(lambda frame: rms_int16(frame) > 500, frame_size=480, hangover=0.5)
+    utterance = endpointer.capture(reader, timeout=5, muted=assistant.playback_mute,
+                                   on_onset=assistant.speech_started.set)
+    feeder.join()
+    return (utterance.samples.copy() if utterance is not None else None), spoken
+
+
+def test_one_breath_command_is_captured_without_acknowledgment():
+    samples, spoken = capture([(USER, 30), (0, 40)])
+    assert samples is not None
+    assert spoken == []
+    assert (samples == USER).sum() >= 25 * BLOCK
+
+
+def test_acknowledgment_is_not_captured():
+    samples, spoken = capture([(0, 60), (USER, 30), (0, 40)])
+    assert spoken == ["How can I help?"]
+    assert samples is not None
+    assert not (samples == ECHO).any()
+    assert (samples == USER).sum() >= 25 * BLOCK
+
+
+if __name__ == "__main__":
+    test_one_breath_command_is_captured_without_acknowledgment()
+    test_acknowledgment_is_not_captured()
+    print("✓ Wake capture tests passed")
@@ -3,10 +3,17 @@ Complete Audio Setup Tool
 Test and configure both microphone and speakers
 """
 
+import os
+import sys
+import time
+
 import speech_recognition as sr
 import sounddevice as sd
 import numpy as np
-import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry as models
 
 
 def print_header(text):
@@ -118,30 +125,29 @@ def test_microphone(device_index=None):
         print("   ✓ Audio captured")
         print(f"   Audio size: {len(audio.get_wav_data())} bytes")
         
-        # Analyze audio level
-        audio_data = np.frombuffer(audio.get_wav_data(), dtype=np.int16)
-        rms = np.sqrt(np.mean(audio_data**2))
-        max_amplitude = np.max(np.abs(audio_data))
+        # Analyze audio level (raw 16 kHz samples, no WAV header)
+        audio_data = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        rms = np.sqrt(np.mean(audio_data.astype(np.float64) ** 2))
+        max_amplitude = np.max(np.abs(audio_data.astype(np.int32)))
         print(f"   Signal strength: RMS={int(rms)}, Peak={int(max_amplitude)}")
         
         if rms < 50:
             print("   ⚠ WARNING: Very weak signal! Microphone may be too quiet or muted.")
         
-        # Try Whisper transcription first (more accurate)
+        # Try Whisper transcription first (more accurate); the model is
+        # loaded once per process and shared between tests
         try:
-            import whisper
             print("\n   🔄 Transcribing with Whisper (this may take a moment)...")
-            model = whisper.load_model("base")
-            
             audio_np = audio_data.astype(np.float32) / 32768.0
             
             # Use language hint and adjust settings for better detection
-            result = model.transcribe(
-                audio_np,
-                language="en",
-                fp16=False,
-                initial_prompt="Hello, this is a microphone test"
-            )
+            with models.acquire_whisper("base", "cpu") as model:
+                result = model.transcribe(
+                    audio_np,
+                    language="en",
+                    fp16=False,
+                    initial_prompt="Hello, this is a microphone test"
+                )
             
             transcribed_text = result["text"].strip()
             
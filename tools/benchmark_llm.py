@@ -0,0 +1,106 @@
+"""
+LLM turn latency benchmark
+
+Drives the real VoiceAssistant turn logic (think / think_and_speak) against
+the local LLM stand-in, so streaming and TTS pipelining can be measured
+offline. Speech is synthesized with the configured TTS engine and consumed
+by a simulated output device in real time; without a TTS engine only the
+LLM timings are measured.
+
+Usage (from the project root):
+    python tools/benchmark_llm.py
+    python tools/benchmark_llm.py --turns 10 --ttft 600 --chunk-ms 80
+    python tools/benchmark_llm.py --script replies.json --no-streaming
+    python tools/benchmark_llm.py --live   # Against Gemini (needs GEMINI_API_KEY)
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROMPTS = [
+    "What can you do?",
+    "Tell me a joke.",
+    "How far away is the moon?",
+    "Give me a tip for staying focused.",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark LLM turn latency against the local stand-in")
+    parser.add_argument("--turns", type=int, default=5, help="Turns to run")
+    parser.add_argument("--ttft", type=int, default=400, help="Stand-in time to first token (ms)")
+    parser.add_argument("--chunk-ms", type=int, default=60, help="Stand-in delay between chunks (ms)")
+    parser.add_argument("--script", help="JSON list/dict of replies for the stand-in")
+    parser.add_argument("--personality", help="Personality JSON")
+    parser.add_argument("--no-streaming", action="store_true", help="Benchmark the non-streaming path")
+    parser.add_argument("--live", action="store_true", help="Use Gemini instead of the stand-in")
+    return parser.parse_args()
+
+
+def summarize(name, values, unit="s"):
+    values = [v for v in values if v is not None]
+    if not values:
+        return f"  {name:<14} -"
+    return (f"  {name:<14} mean {statistics.mean(values):.3f}{unit}  "
+            f"min {min(values):.3f}{unit}  max {max(values):.3f}{unit}")
+
+
+def main():
+    args = parse_args()
+
+    # Configuration is read at import time, so set it up before importing the assistant
+    if not args.live:
+        os.environ["LLM_BACKEND"] = "local"
+        os.environ["LOCAL_LLM_TTFT_MS"] = str(args.ttft)
+        os.environ["LOCAL_LLM_CHUNK_MS"] = str(args.chunk_ms)
+        if args.script:
+            os.environ["LOCAL_LLM_SCRIPT"] = args.script
+    os.environ["ENABLE_STREAMING"] = "false" if args.no_streaming else "true"
+    # Measure synthesis, not cache hits or background phrase rendering
+    os.environ["TTS_CACHE_ENABLED"] = "false"
+    os.environ["PHRASE_CACHE_ENABLED"] = "false"
+    os.environ["PLUGINS_ENABLED"] = "false"
+
+    from main import VoiceAssistant
+
+    assistant = VoiceAssistant(args.personality, audio_input=False, simulate_output=True)
+    has_tts = assistant.tts_engine is not None
+    streaming = not args.no_streaming and has_tts
+
+    results = []
+    for turn in range(args.turns):
+        prompt = PROMPTS[turn % len(PROMPTS)]
+        print(f"\n--- Turn {turn + 1}/{args.turns}: {prompt}")
+        if streaming:
+            assistant.think_and_speak(prompt)
+        elif has_tts:
+            assistant.think_then_speak(prompt)
+        else:
+            assistant.think(prompt)
+        results.append(dict(assistant.last_turn))
+
+    assistant.player.close()
+
+    print("\n" + "=" * 60)
+    if not has_tts:
+        mode = "text only (no TTS engine)"
+    else:
+        mode = "streaming + sentence pipeline" if streaming else "non-streaming"
+    print(f"LLM benchmark: {args.turns} turn(s), {mode}, TTS: {assistant.tts_type}")
+    print(summarize("TTFT", [r.get("ttft") for r in results]))
+    print(summarize("LLM total", [r.get("llm_total") for r in results]))
+    print(summarize("First audio", [r.get("first_audio") for r in results]))
+    print(summarize("Turn total", [r.get("total") for r in results]))
+    print(summarize("TTS overlap", [r.get("tts_overlap") for r in results]))
+    print(f"  Context        {assistant.history.describe()}")
+    print(f"  {assistant.player.format_stats()}")
+    if assistant.response_cache:
+        print(f"  {assistant.response_cache.format_stats()}")
+
+
+if __name__ == "__main__":
+    main()
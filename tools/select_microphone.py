@@ -1,7 +1,14 @@
 """Select and test specific microphone"""
+import os
+import sys
+
 import speech_recognition as sr
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry as models
+
 def test_specific_mic(mic_index):
     """Test a specific microphone"""
     print(f"\n🎤 Testing Microphone #{mic_index}")
@@ -23,14 +30,13 @@ def test_specific_mic(mic_index):
             print("✓ Audio captured!")
             print(f"  Audio length: {len(audio.get_wav_data())} bytes")
             
-            # Try Whisper
+            # Try Whisper (loaded once per process, shared between tests)
             try:
-                import whisper
                 print("\n🔄 Transcribing with Whisper...")
-                model = whisper.load_model("base")
-                
-                audio_np = np.frombuffer(audio.get_wav_data(), dtype=np.int16).astype(np.float32) / 32768.0
-                result = model.transcribe(audio_np)
+                audio_np = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2),
+                                         dtype=np.int16).astype(np.float32) / 32768.0
+                with models.acquire_whisper("base", "cpu") as model:
+                    result = model.transcribe(audio_np, fp16=False)
                 
                 print(f"✓ Whisper heard: '{result['text']}'")
                 return True
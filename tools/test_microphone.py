@@ -1,7 +1,14 @@
 """Test microphone and speech recognition"""
+import os
+import sys
+
 import speech_recognition as sr
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry as models
+
 def test_microphone():
     """Test if microphone is working"""
     print("🎤 Testing Microphone Setup\n")
@@ -33,12 +40,11 @@ def test_microphone():
             
             # Try Whisper if available
             try:
-                import whisper
                 print("\n🔄 Testing Whisper transcription...")
-                model = whisper.load_model("base")
-                
-                audio_np = np.frombuffer(audio.get_wav_data(), dtype=np.int16).astype(np.float32) / 32768.0
-                result = model.transcribe(audio_np)
+                audio_np = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2),
+                                         dtype=np.int16).astype(np.float32) / 32768.0
+                with models.acquire_whisper("base", "cpu") as model:
+                    result = model.transcribe(audio_np, fp16=False)
                 
                 print(f"✓ Whisper heard: '{result['text']}'")
                 
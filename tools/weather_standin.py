@@ -0,0 +1,81 @@
+"""
+Local stand-in for the wttr.in weather service
+
+Serves canned wttr.in-style JSON (format=j1) for any location, with an
+optional artificial delay, so the weather plugin can be tested offline.
+
+Usage (from the project root):
+    python tools/weather_standin.py --port 8765 --delay-ms 300
+    WEATHER_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import json
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+CONDITIONS = ["Sunny", "Partly cloudy", "Overcast", "Light rain", "Mist"]
+
+
+def report(location: str) -> dict:
+    """Deterministic fake report for a location"""
+    seed = zlib.crc32(location.lower().encode("utf-8"))
+    temp_c = seed % 35 - 5
+    return {
+        "current_condition": [{
+            "temp_C": str(temp_c),
+            "temp_F": str(round(temp_c * 9 / 5 + 32)),
+            "FeelsLikeC": str(temp_c - seed % 4),
+            "humidity": str(30 + seed % 60),
+            "weatherDesc": [{"value": CONDITIONS[seed % len(CONDITIONS)]}],
+        }],
+        "nearest_area": [{"areaName": [{"value": location}]}],
+    }
+
+
+def make_handler(delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real service
+        requests_served = 0
+
+        def do_GET(self):
+            location = unquote(urlparse(self.path).path.strip("/"))
+            time.sleep(delay)
+            if not location or location.lower() == "nowhere":
+                self.send_error(404, "Unknown location")
+                return
+            body = json.dumps(report(location)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            Handler.requests_served += 1
+
+        def log_message(self, format, *args):
+            print(f"🌦️  {self.address_string()} {format % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake wttr.in weather reports")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=int, default=0, help="Artificial latency per request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.delay_ms / 1000))
+    print(f"🌦️  Weather stand-in on http://{args.host}:{args.port} (set WEATHER_BASE_URL to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Content-addressed TTS audio cache
+
+Synthesized speech is stored on disk as zlib-compressed 16-bit PCM, keyed by
+a hash of (engine, voice, speed, normalized text). Repeated replies -- plugin
+output, help text, common answers -- are replayed from disk without touching
+the TTS model. The cache is capped in size and evicts least recently used
+entries.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+_SUFFIX = ".pcm.z"
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different strings share an entry"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TTSCache:
+    """On-disk LRU cache of synthesized speech.
+
+    Args:
+        directory: Where entries are stored
+        max_bytes: Total size cap for stored (compressed) entries
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def key(engine: str, voice: str, speed, text: str) -> str:
+        payload = json.dumps([engine, voice, speed, normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def _scan(self):
+        """Rebuild the LRU order from the files on disk (modification time = last use)"""
+        found = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            found.append((stat.st_mtime, name[:-len(_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached float32 audio for key, or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pcm = np.frombuffer(zlib.decompress(f.read()), dtype=np.int16)
+            os.utime(path)
+        except (OSError, zlib.error):
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return pcm.astype(np.float32) / 32768.0
+
+    def put(self, key: str, audio: np.ndarray):
+        """Store float32 audio under key, evicting old entries past the size cap"""
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+        data = zlib.compress(pcm.tobytes(), 1)
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        ratio = f"{stats['hit_ratio']:.0%}" if stats["hit_ratio"] is not None else "-"
+        return (f"TTS cache: {stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB "
+                f"of {self.max_bytes / (1024 * 1024):.0f} MB, {stats['hits']} hits / "
+                f"{stats['misses']} misses ({ratio}), {stats['evictions']} evicted")
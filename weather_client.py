@@ -0,0 +1,142 @@
+"""
+Weather lookups for the weather plugin
+
+wttr.in is queried through one pooled HTTP session, and answers are cached
+per location: fresh for ttl seconds, then served stale for up to stale_ttl
+more while a background refresh runs. Unknown locations (404) are
+remembered for negative_ttl seconds so repeats don't hit the network. Home locations can be prefetched and
+kept fresh so "what's the weather" never waits on the network. base_url can
+point at a local stand-in (tools/weather_standin.py) for tests.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+
+class WeatherClient:
+    """Cached, pooled client for wttr.in-style JSON weather.
+
+    Args:
+        base_url: Service root; locations are requested as {base_url}/{location}?format=j1
+        ttl: Seconds a cached report is fresh
+        stale_ttl: Further seconds a report may be served while it is refreshed
+        timeout: HTTP timeout in seconds
+        home_locations: Locations to prefetch and use when none is named
+        negative_ttl: Seconds an unknown location is remembered as unknown
+    """
+
+    def __init__(self, base_url: str = "https://wttr.in", ttl: float = 600, stale_ttl: float = 3600,
+                 timeout: float = 5.0, home_locations: Optional[List[str]] = None,
+                 negative_ttl: float = 300):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.home_locations = list(home_locations or [])
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._session = None
+        self._cache: Dict[str, Tuple[float, Optional[dict]]] = {}  # location -> (fetched at, report or None if unknown)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._prefetcher = None
+
+    @property
+    def session(self):
+        """One requests.Session, so connections (and TLS) are reused across lookups"""
+        if self._session is None:
+            import requests
+            # Plugin workers and the prefetcher may get here at once; only one builds it
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def fetch(self, location: str) -> Optional[dict]:
+        """Query the service now and cache the report (None if the location isn't known)"""
+        response = self.session.get(f"{self.base_url}/{quote(location)}",
+                                    params={"format": "j1"}, timeout=self.timeout)
+        if response.status_code == 404:
+            with self._lock:
+                self._cache[location.lower()] = (time.time(), None)
+            return None
+        if response.status_code != 200:
+            return None
+        report = response.json()
+        with self._lock:
+            self._cache[location.lower()] = (time.time(), report)
+        return report
+
+    def get(self, location: str) -> Optional[dict]:
+        """Report for location, from cache when possible"""
+        with self._lock:
+            cached = self._cache.get(location.lower())
+        age = time.time() - cached[0] if cached else None
+        if age is not None and cached[1] is None:
+            if age < self.negative_ttl:
+                self.hits += 1
+                return None
+            age = None  # Ask again
+        if age is not None and age < self.ttl:
+            self.hits += 1
+            return cached[1]
+        if age is not None and age < self.ttl + self.stale_ttl:
+            self.stale_hits += 1
+            self._refresh_async(location)
+            return cached[1]
+        self.misses += 1
+        return self.fetch(location)
+
+    def _refresh_async(self, location: str):
+        key = location.lower()
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.fetch(location)
+            except Exception as e:
+                print(f"⚠️  Weather refresh for {location} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True, name="weather-refresh").start()
+
+    def start_prefetch(self, interval: Optional[float] = None):
+        """Keep the home locations' reports fresh in the background"""
+        if not self.home_locations or self._prefetcher is not None:
+            return
+        interval = interval or self.ttl * 0.9
+
+        def prefetch():
+            while not self._stop.is_set():
+                for location in self.home_locations:
+                    try:
+                        self.fetch(location)
+                    except Exception as e:
+                        print(f"⚠️  Weather prefetch for {location} failed: {e}")
+                self._stop.wait(interval)
+
+        self._prefetcher = threading.Thread(target=prefetch, daemon=True, name="weather-prefetch")
+        self._prefetcher.start()
+
+    def close(self):
+        self._stop.set()
+        if self._session is not None:
+            self._session.close()
+
+    def format_stats(self) -> str:
+        return (f"Weather cache: {len(self._cache)} location(s), {self.hits} fresh / "
+                f"{self.stale_hits} stale hits, {self.misses} misses")